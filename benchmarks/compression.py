@@ -0,0 +1,73 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from cryptography.fernet import Fernet
+
+from classmarks.encrypt import FRAME, Encryptor
+from classmarks.storage import pack, unpack
+
+from gradebook import make_subject
+
+LEVELS = {"none": [0], "zlib": [1, 6, 9], "lzma": [0, 6, 9]}
+
+
+def measure(subject, compression, level, repeat, folder):
+    encryptor = Encryptor(compression, level)
+    path = os.path.join(folder, "{}_{}.meow".format(compression, level))
+    encryptor.save(subject, "benchmark", path)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        encryptor.resave(subject)
+    save = (time.perf_counter() - start) / repeat
+    with open(path, "rb") as file:
+        data = file.read()
+    params, flags, offset = encryptor.parse_header(data)
+    token = data[offset + FRAME.size :]
+    fernet = Fernet(encryptor.session.get())
+    start = time.perf_counter()
+    for _ in range(repeat):
+        unpack(encryptor.decompress(fernet.decrypt(token), flags))
+    load = (time.perf_counter() - start) / repeat
+    return {
+        "compression": compression,
+        "level": level,
+        "bytes": len(data),
+        "save_ms": save * 1000,
+        "load_ms": load * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare .meow compression levels")
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--tests", type=int, default=4)
+    parser.add_argument("--fill", type=float, default=0.6)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    subject = make_subject(args.students, n_tests=args.tests, fill=args.fill)
+    raw = len(pack(subject))
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        for compression, levels in LEVELS.items():
+            for level in levels:
+                result = measure(subject, compression, level, args.repeat, folder)
+                results.append(result)
+    print("serialized body: {} bytes".format(raw))
+    print("codec  level      bytes      save      load")
+    row = "{compression:<6} {level:>5} {bytes:>10} {save_ms:>6.2f} ms "
+    row += "{load_ms:>6.2f} ms"
+    for result in results:
+        print(row.format(**result))
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"raw_bytes": raw, "results": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
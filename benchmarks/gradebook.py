@@ -0,0 +1,92 @@
+import random
+
+import numpy as np
+
+from classmarks import Subject
+
+
+SHAPES = {
+    "balanced": (3, 3),
+    "wide": (1, 1),
+    "many_majors": (None, 1),
+}
+
+
+def get_tree(n_assessments, shape="balanced"):
+    n_majors, n_subs = SHAPES[shape]
+    if n_majors is None:
+        n_majors = max(1, n_assessments // 4)
+    n_tests = max(1, n_assessments // (n_majors * n_subs))
+    return (n_majors, n_subs, n_tests)
+
+
+def make_names(n_students, seed=0, long_names=True):
+    rng = random.Random(seed)
+    names = []
+    genders = []
+    for index in range(n_students):
+        name = "Student {}".format(index)
+        if long_names:
+            first = rng.choice(FIRST_NAMES)
+            name = "{} {} {}".format(first, " ".join(rng.sample(LAST_NAMES, 2)), index)
+        names.append(name)
+        genders.append(rng.choice(["male", "female"]))
+    return (names, genders)
+
+
+def make_subject(
+    n_students=30, n_majors=3, n_subs=3, n_tests=4, fill=0.6, seed=0, long_names=True
+):
+    subject = Subject("Grade {}".format(seed), "Benchmark")
+    subject.add_students(*make_names(n_students, seed, long_names))
+    tests = []
+    for _ in range(n_majors):
+        major = subject.add_ass()
+        for _ in range(n_subs):
+            sub = subject.add_ass(parent=major)
+            tests += subject.add_asses([None] * n_tests, sub)
+    columns = [subject.tests.get_index(test) for test in tests]
+    generator = np.random.default_rng(seed)
+    marks = np.round(generator.uniform(1, 6, (n_students, len(tests))), 1)
+    marks[generator.random(marks.shape) > fill] = 0
+    subject.marks.values[:, columns] = marks
+    subject.take_journal()
+    subject.rollup = None
+    subject.calc_scores()
+    return subject
+
+
+def make_gradebook(n_students, n_assessments, shape="balanced", **kwargs):
+    return make_subject(n_students, *get_tree(n_assessments, shape), **kwargs)
+
+
+FIRST_NAMES = [
+    "Anna",
+    "Ben",
+    "Clara",
+    "David",
+    "Elena",
+    "Felix",
+    "Greta",
+    "Hugo",
+    "Ida",
+    "Jonas",
+    "Lea",
+    "Maximilian",
+    "Nora",
+    "Oskar",
+    "Paula",
+]
+LAST_NAMES = [
+    "Bachmann",
+    "Fischer",
+    "Gerber",
+    "Huber",
+    "Keller",
+    "Meier",
+    "Müller",
+    "Schmid",
+    "Steiner",
+    "Weber",
+    "Zimmermann",
+]
@@ -0,0 +1,198 @@
+import argparse
+import datetime
+import itertools
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import suite
+
+MIN_SAMPLE = 0.05
+
+
+def get_benchmarks(pattern=None):
+    benchmarks = []
+    for name in dir(suite):
+        cls = getattr(suite, name)
+        if isinstance(cls, type) and hasattr(cls, "params"):
+            for method in sorted(dir(cls)):
+                full_name = "{}.{}".format(name, method)
+                if not method.startswith("time_"):
+                    continue
+                if not pattern or pattern in full_name:
+                    benchmarks.append((full_name, cls, method))
+    return benchmarks
+
+
+def get_grid(cls, sizes):
+    params = []
+    for name, values in zip(cls.param_names, cls.params):
+        params.append(sizes.get(name, values))
+    grid = itertools.product(*params)
+    return [dict(zip(cls.param_names, values)) for values in grid]
+
+
+def measure(func, repeat):
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SAMPLE or number >= 1 << 20:
+            break
+        if elapsed > 0:
+            number = max(number * 2, int(number * MIN_SAMPLE / elapsed) + 1)
+        else:
+            number *= 10
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return (samples, number)
+
+
+def measure_fresh(cls, method, args, repeat):
+    samples = []
+    for _ in range(repeat):
+        instance = cls()
+        instance.setup(*args)
+        try:
+            func = getattr(instance, method)
+            start = time.perf_counter()
+            for _ in range(cls.number):
+                func(*args)
+            samples.append((time.perf_counter() - start) / cls.number)
+        finally:
+            if hasattr(instance, "teardown"):
+                instance.teardown(*args)
+    return (samples, cls.number)
+
+
+def run(benchmarks, sizes, repeat, file=sys.stdout):
+    results = []
+    for full_name, cls, method in benchmarks:
+        for params in get_grid(cls, sizes):
+            args = list(params.values())
+            if hasattr(cls, "number"):
+                samples, number = measure_fresh(cls, method, args, repeat)
+            else:
+                instance = cls()
+                instance.setup(*args)
+                try:
+                    func = getattr(instance, method)
+                    samples, number = measure(lambda: func(*args), repeat)
+                finally:
+                    if hasattr(instance, "teardown"):
+                        instance.teardown(*args)
+            result = {
+                "name": full_name,
+                "params": params,
+                "min": min(samples),
+                "median": statistics.median(samples),
+                "number": number,
+                "repeat": repeat,
+            }
+            results.append(result)
+            line = "{:<28} {:<48} {:>12}".format(
+                full_name, format_params(params), format_time(result["min"])
+            )
+            print(line, file=file)
+    return results
+
+
+def format_params(params):
+    return " ".join("{}={}".format(key, value) for key, value in params.items())
+
+
+def format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return "{:.3f} {}".format(seconds / scale, unit)
+    return "{:.1f} ns".format(seconds * 1e9)
+
+
+def get_commit():
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True
+        )
+    except OSError:
+        return None
+    return output.stdout.strip() or None
+
+
+def compare(results, baseline, threshold):
+    previous = {
+        (result["name"], format_params(result["params"])): result["min"]
+        for result in baseline["results"]
+    }
+    regressions = []
+    for result in results:
+        old = previous.get((result["name"], format_params(result["params"])))
+        if old and result["min"] > old * threshold:
+            regressions.append((result, result["min"] / old))
+    return regressions
+
+
+def parse_sizes(args):
+    sizes = {}
+    if args.quick:
+        sizes.update(suite.QUICK)
+    if args.students:
+        sizes["students"] = [int(value) for value in args.students.split(",")]
+    if args.assessments:
+        sizes["assessments"] = [int(value) for value in args.assessments.split(",")]
+    if args.shape:
+        sizes["shape"] = args.shape.split(",")
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the classmarks benchmarks")
+    parser.add_argument("-k", dest="pattern", help="only run benchmarks matching this")
+    parser.add_argument("--quick", action="store_true", help="skip the largest sizes")
+    parser.add_argument("--students", help="comma separated student counts")
+    parser.add_argument("--assessments", help="comma separated assessment counts")
+    parser.add_argument("--shape", help="comma separated tree shapes")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.5)
+    args = parser.parse_args()
+
+    benchmarks = get_benchmarks(args.pattern)
+    results = run(benchmarks, parse_sizes(args), args.repeat)
+    report = {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": get_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "system": platform.system(),
+        },
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for result, ratio in regressions:
+            msg = "REGRESSION {} {} {:.2f}x slower"
+            print(msg.format(result["name"], format_params(result["params"]), ratio))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
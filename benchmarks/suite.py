@@ -0,0 +1,123 @@
+import os
+import random
+import tempfile
+from functools import lru_cache
+
+import numpy as np
+
+from classmarks import History
+from classmarks.encrypt import Encryptor
+from classmarks.storage import pack, unpack
+
+from gradebook import SHAPES, make_gradebook
+
+STUDENTS = [30, 300, 3000, 30000]
+ASSESSMENTS = [10, 100, 1000]
+QUICK = {"students": [30, 300, 3000], "assessments": [10, 100]}
+
+
+@lru_cache(maxsize=1)
+def get_history(students, assessments, shape):
+    return History(make_gradebook(students, assessments, shape))
+
+
+class Editing:
+    params = [STUDENTS, ASSESSMENTS, list(SHAPES)]
+    param_names = ["students", "assessments", "shape"]
+
+    def setup(self, students, assessments, shape):
+        self.subject = make_gradebook(students, assessments, shape)
+        self.rng = random.Random(0)
+        self.tests = [test for test in self.subject.tests if test.group == "test"]
+        self.subs = [test for test in self.subject.tests if test.group == "sub"]
+        self.subject.get_rollup()
+
+    def time_edit_mark(self, students, assessments, shape):
+        student = self.rng.choice(self.subject.students)
+        test = self.rng.choice(self.tests)
+        self.subject.edit_mark(student, test, self.rng.choice([0, 2.5, 4, 6]))
+
+    def time_edit_marks(self, students, assessments, shape):
+        rows = self.rng.sample(self.subject.students, min(10, students))
+        tests = self.rng.sample(self.tests, min(10, len(self.tests)))
+        marks = np.full((len(rows), len(tests)), self.rng.choice([2.5, 4, 6]))
+        self.subject.edit_marks(marks, rows, tests)
+
+    def time_calc_scores(self, students, assessments, shape):
+        self.subject.calc_scores()
+
+    def time_compile_rollup(self, students, assessments, shape):
+        self.subject.rollup = None
+        self.subject.get_rollup()
+
+    def time_check_weights(self, students, assessments, shape):
+        self.subject.check_weights()
+
+    def time_tests_getitem(self, students, assessments, shape):
+        self.subject.tests[self.rng.randrange(self.subject.n_tests)]
+
+
+class Growing:
+    params = [STUDENTS, ASSESSMENTS, list(SHAPES)]
+    param_names = ["students", "assessments", "shape"]
+    number = 1
+
+    def setup(self, students, assessments, shape):
+        history = get_history(students, assessments, shape)
+        while history.undo():
+            pass
+        self.subject = history.subject
+        self.rng = random.Random(0)
+        self.subs = [test for test in self.subject.tests if test.group == "sub"]
+        self.subject.get_rollup()
+
+    def time_add_student(self, students, assessments, shape):
+        self.subject.add_student()
+
+    def time_add_ass(self, students, assessments, shape):
+        self.subject.add_ass(parent=self.rng.choice(self.subs))
+
+
+class Storage:
+    params = [STUDENTS, ASSESSMENTS]
+    param_names = ["students", "assessments"]
+
+    def setup(self, students, assessments):
+        self.subject = make_gradebook(students, assessments)
+        self.data = pack(self.subject)
+
+    def time_pack(self, students, assessments):
+        pack(self.subject)
+
+    def time_unpack(self, students, assessments):
+        unpack(self.data)
+
+
+class Files:
+    params = [STUDENTS, ASSESSMENTS]
+    param_names = ["students", "assessments"]
+
+    def setup(self, students, assessments):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "bench.meow")
+        self.subject = make_gradebook(students, assessments)
+        self.encryptor = Encryptor(compact_size=float("inf"))
+        self.encryptor.save(self.subject, "benchmark", self.path)
+        self.student = self.subject.students[0]
+        self.test = [test for test in self.subject.tests if test.group == "test"][0]
+
+    def teardown(self, students, assessments):
+        self.folder.cleanup()
+
+    def time_save(self, students, assessments):
+        self.encryptor.save(self.subject, "benchmark", self.path)
+
+    def time_resave(self, students, assessments):
+        self.encryptor.resave(self.subject)
+
+    def time_append(self, students, assessments):
+        self.subject.edit_mark(self.student, self.test, 4.5)
+        self.encryptor.append(self.subject.take_journal())
+
+    def time_read(self, students, assessments):
+        Encryptor().read(self.path, "benchmark")
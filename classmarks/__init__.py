@@ -1 +1,3 @@
 from .subject import Subject
+from .api import Gradebook
+from .history import History
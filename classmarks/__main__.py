@@ -0,0 +1,132 @@
+import argparse
+import getpass
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+ID_COLUMNS = ["file", "class", "subject", "student", "gender"]
+
+
+def find_files(paths, recursive=False):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            if recursive:
+                for folder, dirs, names in os.walk(path):
+                    dirs.sort()
+                    for name in sorted(names):
+                        if name.endswith(".meow"):
+                            files.append(os.path.join(folder, name))
+            else:
+                for name in sorted(os.listdir(path)):
+                    if name.endswith(".meow"):
+                        files.append(os.path.join(path, name))
+        else:
+            files.append(path)
+    return files
+
+
+def get_password(args):
+    if args.password_env:
+        pw = os.environ.get(args.password_env)
+        if pw is None:
+            msg = "Environment variable {} is not set".format(args.password_env)
+            raise SystemExit(msg)
+        return pw
+    if args.password_file:
+        with open(args.password_file, encoding="utf-8") as file:
+            return file.readline().rstrip("\r\n")
+    return getpass.getpass("Password: ")
+
+
+def read_scores(path, pw):
+    from .encrypt import Encryptor
+
+    encryptor = Encryptor()
+    subject = encryptor.read(path, pw)
+    if encryptor.replay_error:
+        print("{}: {}".format(path, encryptor.replay_error), file=sys.stderr)
+    subject.calc_scores()
+    tests = [subject.tests] + list(subject.tests.children)
+    columns = ["Total"]
+    for test in tests[1:]:
+        name = test.name
+        while name in ID_COLUMNS or name in columns:
+            name = "major " + name
+        columns.append(name)
+    marks = [subject.get_marks(test).tolist() for test in tests]
+    rows = []
+    for index, student in enumerate(subject.students):
+        row = {
+            "file": path,
+            "class": subject.grade,
+            "subject": subject.subject_name,
+            "student": student.fullname,
+            "gender": student.gender,
+        }
+        for name, values in zip(columns, marks):
+            row[name] = values[index]
+        rows.append(row)
+    return (columns, rows)
+
+
+def collect(files, pw, jobs=None):
+    results = {}
+    errors = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(read_scores, path, pw): path for path in files}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                results[path] = future.result()
+            except Exception as error:
+                errors.append((path, error))
+    columns = []
+    rows = []
+    for path in files:
+        if path in results:
+            file_columns, file_rows = results[path]
+            columns += [name for name in file_columns if name not in columns]
+            rows += file_rows
+    return (columns, rows, errors)
+
+
+def write_table(columns, rows, output):
+    import pandas as pd
+
+    df = pd.DataFrame(rows, columns=ID_COLUMNS + columns)
+    if output and output.endswith(".parquet"):
+        df.to_parquet(output, index=False)
+    else:
+        df.to_csv(output if output else sys.stdout, sep=";", index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="classmarks",
+        description="Combine the Total and major scores of many .meow files.",
+    )
+    parser.add_argument("paths", nargs="+", help=".meow files or folders of them")
+    parser.add_argument("-o", "--output", help=".csv or .parquet, stdout if omitted")
+    parser.add_argument("-r", "--recursive", action="store_true")
+    parser.add_argument("-j", "--jobs", type=int, help="worker processes")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--password-env", metavar="VAR")
+    source.add_argument("--password-file", metavar="FILE")
+    args = parser.parse_args(argv)
+
+    files = find_files(args.paths, args.recursive)
+    if not files:
+        parser.error("no .meow files found")
+    pw = get_password(args)
+    columns, rows, errors = collect(files, pw, args.jobs)
+    for path, error in errors:
+        msg = str(error) or type(error).__name__
+        print("{}: {}".format(path, msg), file=sys.stderr)
+    if rows or not errors:
+        write_table(columns, rows, args.output)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import numpy as np
+
+from .history import DEFAULT_BUDGET, History
+from .subject import Subject
+
+MAX_DEPTH = 3
+
+
+class Gradebook:
+    def __init__(self, subject=None, encryptor=None, budget=DEFAULT_BUDGET):
+        if subject is None:
+            subject = Subject()
+        self.subject = subject
+        self.encryptor = encryptor
+        self.history = History(subject, budget)
+
+    def __repr__(self):
+        path = self.encryptor.path if self.encryptor else None
+        return "Gradebook({}, path={})".format(self.subject, path)
+
+    @classmethod
+    def new(cls, grade="class", subject_name="subject"):
+        return cls(Subject(grade, subject_name))
+
+    @classmethod
+    def open(cls, path, pw):
+        from .encrypt import Encryptor
+
+        encryptor = Encryptor()
+        subject = encryptor.read(path, pw)
+        subject.calc_scores()
+        return cls(subject, encryptor)
+
+    def save(self, path=None, pw=None):
+        from .encrypt import Encryptor
+
+        if self.encryptor is None:
+            self.encryptor = Encryptor()
+        if path is None and self.encryptor.path is None:
+            raise ValueError("A path is needed to save a new gradebook")
+        if pw is not None:
+            self.subject.take_journal()
+            self.encryptor.save(self.subject, pw, path or self.encryptor.path)
+        elif self.encryptor.session is None:
+            raise ValueError("A password is needed to save a new gradebook")
+        elif path is not None and path != self.encryptor.path:
+            self.subject.take_journal()
+            self.encryptor.path = path
+            self.encryptor.resave(self.subject)
+        elif self.encryptor.needs_compaction():
+            self.subject.take_journal()
+            self.encryptor.resave(self.subject)
+        else:
+            self.encryptor.append(self.subject.take_journal())
+        return self.encryptor.path
+
+    def export(self, path):
+        self.subject.export(path)
+
+    def undo(self):
+        return self.history.undo()
+
+    def redo(self):
+        return self.history.redo()
+
+    @property
+    def students(self):
+        return [student.fullname for student in self.subject.students]
+
+    @property
+    def assessments(self):
+        return [test.name for test in self.subject.tests]
+
+    def add_students(self, names, genders=None):
+        return self.subject.add_students(names, genders)
+
+    def add_assessments(self, tree, parent=None):
+        if parent is None:
+            parent = self.subject.tests
+        elif isinstance(parent, str):
+            parent = self.get_assessment(parent)
+        self.check_tree(tree, parent)
+        return self.add_tree(tree, parent)
+
+    def check_tree(self, tree, parent):
+        if parent.root is not self.subject.tests or parent.group == "test":
+            raise ValueError("Cannot add assessments to {}".format(parent.name))
+        if parent.depth + self.get_depth(tree) > MAX_DEPTH:
+            raise ValueError("Assessments can only be nested three levels deep")
+        seen = set()
+        for name in self.get_names(tree):
+            if name in seen:
+                raise ValueError("Assessment {} appears twice".format(name))
+            if self.subject.tests.check_collision(name):
+                raise ValueError("Assessment {} already exists".format(name))
+            seen.add(name)
+
+    def add_tree(self, tree, parent):
+        names = list(tree)
+        specs = [tree[name] or {} for name in names]
+        weights = [spec.get("weight", 1.0) for spec in specs]
+        dates = [spec.get("date", "") for spec in specs]
+        asses = self.subject.add_asses(names, parent, weights, dates)
+        for ass, spec in zip(asses, specs):
+            if spec.get("children"):
+                self.add_tree(spec["children"], ass)
+        return asses
+
+    def get_names(self, tree):
+        names = []
+        for name, spec in tree.items():
+            names.append(name)
+            children = (spec or {}).get("children")
+            if children:
+                names += self.get_names(children)
+        return names
+
+    def get_depth(self, tree):
+        depth = 0
+        for spec in tree.values():
+            children = (spec or {}).get("children")
+            depth = max(depth, 1 + (self.get_depth(children) if children else 0))
+        return depth
+
+    def get_student(self, name):
+        student = self.subject.get_student_by_name(name)
+        if student is None:
+            raise KeyError(name)
+        return student
+
+    def get_assessment(self, name):
+        ass = self.subject.get_ass_by_name(name)
+        if ass is None:
+            raise KeyError(name)
+        return ass
+
+    def get_positions(self, students, assessments):
+        marks = self.subject.marks
+        rows = slice(None)
+        cols = slice(None)
+        if students is not None:
+            rows = [marks.row(name) for name in students]
+        if assessments is not None:
+            cols = [marks.column(name) for name in assessments]
+        return (rows, cols)
+
+    def marks(self, students=None, assessments=None):
+        if not self.subject.get_rollup().computed:
+            self.subject.calc_scores()
+        rows, cols = self.get_positions(students, assessments)
+        values = self.subject.marks.values
+        if isinstance(rows, list) and isinstance(cols, list):
+            return values[np.ix_(rows, cols)]
+        return values[rows, cols].copy()
+
+    def scores(self, name="Total"):
+        return self.marks(assessments=[name])[:, 0]
+
+    def set_marks(self, values, students=None, assessments=None):
+        if students is None:
+            students = self.students
+        if assessments is None:
+            tests = self.subject.tests
+            assessments = [test.name for test in tests if test.group == "test"]
+        students = [self.get_student(name) for name in students]
+        assessments = [self.get_assessment(name) for name in assessments]
+        values = np.asarray(values, dtype=float)
+        if values.ndim == 1:
+            values = values.reshape(len(students), len(assessments))
+        self.subject.edit_marks(values, students, assessments)
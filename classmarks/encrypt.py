@@ -0,0 +1,362 @@
+import base64
+import pickle
+import gc
+import lzma
+import os
+import shutil
+import struct
+import tempfile
+import zlib
+
+import argon2
+from argon2 import PasswordHasher as Hash
+from cryptography.fernet import Fernet, InvalidToken
+
+from .instrument import timed
+from .journal import encode, decode, replay
+from .storage import pack, unpack
+
+MAGIC = b"MEOW"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHBBIIIH")
+FRAME = struct.Struct("<Q")
+CODECS = {"none": 0, "zlib": 1, "lzma": 2}
+RECOVERY_SUFFIX = ".recovery"
+
+
+class PasswordError(Exception):
+    pass
+
+
+def get_recovery(path):
+    recovery = path + RECOVERY_SUFFIX
+    if os.path.exists(recovery):
+        if not os.path.exists(path):
+            return recovery
+        if os.path.getmtime(recovery) > os.path.getmtime(path):
+            return recovery
+    return None
+
+
+class SessionKey:
+    def __init__(self, params, key):
+        self.params = params
+        self.mask = Fernet.generate_key()
+        self.token = Fernet(self.mask).encrypt(key)
+        del key
+        gc.collect()
+
+    def __repr__(self):
+        return "SessionKey(type={}, salt_len={})".format(
+            self.params["type"], len(self.params["salt"])
+        )
+
+    def get(self):
+        return Fernet(self.mask).decrypt(self.token)
+
+
+class Encryptor:
+    def __init__(self, compression="zlib", level=6, compact_size=64 * 1024):
+        if compression not in CODECS:
+            raise ValueError("Unknown compression {}".format(compression))
+        self.compression = compression
+        self.level = level
+        self.compact_size = compact_size
+        self.hasher = Hash(hash_len=32, salt_len=32)
+        self.path = None
+        self.session = None
+        self.legacy = False
+        self.records = []
+        self.replay_error = None
+        self.end = None
+        self.journal_size = 0
+
+    def read(self, path, pw):
+        return self.load(self.unlock(path, pw))
+
+    def unlock(self, path, pw):
+        pw = bytes(pw, encoding="utf-8")
+        with open(path, "rb") as file:
+            encrypted_data = file.read()
+        self.records = []
+        self.replay_error = None
+        self.end = None
+        self.journal_size = 0
+        try:
+            if encrypted_data.startswith(MAGIC):
+                data, params, key = self.decrypt(encrypted_data, pw)
+                self.legacy = False
+            elif encrypted_data.startswith(b"$argon2"):
+                encrypted_data = encrypted_data.decode("utf-8")
+                data, params, key = self.decrypt_legacy(encrypted_data, pw)
+                self.legacy = True
+            else:
+                raise ValueError("{} is not a classmarks file".format(path))
+        except InvalidToken:
+            raise PasswordError("Incorrect Password") from None
+        self.session = SessionKey(params, key)
+        self.path = path
+        return data
+
+    def load(self, data):
+        if self.legacy:
+            return pickle.loads(data)
+        subject = unpack(data)
+        try:
+            replay(subject, self.records)
+        except ValueError as error:
+            self.replay_error = str(error)
+            self.end = None
+        self.records = []
+        return subject
+
+    def save(self, data, pw, path):
+        self.path = path
+        self.rekey(pw)
+        self.resave(data)
+
+    def rekey(self, pw):
+        params = {
+            "type": self.hasher.type,
+            "version": argon2.low_level.ARGON2_VERSION,
+            "salt": os.urandom(self.hasher.salt_len),
+            "time_cost": self.hasher.time_cost,
+            "memory_cost": self.hasher.memory_cost,
+            "parallelism": self.hasher.parallelism,
+            "hash_len": 32,
+        }
+        key = self.derive_key(bytes(pw, encoding="utf-8"), params)
+        self.session = SessionKey(params, key)
+        self.end = None
+        self.journal_size = 0
+        del pw, key
+        gc.collect()
+
+    def resave(self, data):
+        self.encrypt(data, self.session.params, self.session.get())
+
+    def encrypt(self, data, params, key):
+        self.end = None
+        data = self.seal(pack(data), params, key)
+        self.write(data)
+        self.end = len(data)
+        self.journal_size = 0
+
+    def seal(self, data, params, key):
+        encrypted_data = Fernet(key).encrypt(self.compress(data))
+        header = self.create_header(params)
+        return header + FRAME.pack(len(encrypted_data)) + encrypted_data
+
+    def save_recovery(self, data):
+        data = self.seal(data, self.session.params, self.session.get())
+        self.write(data, self.path + RECOVERY_SUFFIX)
+
+    def discard_recovery(self):
+        try:
+            os.remove(self.path + RECOVERY_SUFFIX)
+        except FileNotFoundError:
+            pass
+
+    def restore(self, path):
+        self.path = path
+        self.end = None
+
+    def append(self, records):
+        if self.end is None:
+            raise ValueError("There is no snapshot to append the changes to")
+        if not records:
+            return
+        token = Fernet(self.session.get()).encrypt(encode(records))
+        frame = FRAME.pack(len(token)) + token
+        try:
+            with open(self.path, "r+b") as file:
+                file.seek(self.end)
+                file.write(frame)
+                file.truncate()
+                file.flush()
+                os.fsync(file.fileno())
+        except BaseException:
+            self.end = None
+            raise
+        self.end += len(frame)
+        self.journal_size += len(frame)
+
+    def needs_compaction(self):
+        return self.end is None or self.journal_size >= self.compact_size
+
+    @timed
+    def compress(self, data):
+        if self.compression == "zlib":
+            data = zlib.compress(data, self.level)
+        elif self.compression == "lzma":
+            data = lzma.compress(data, preset=self.level)
+        return data
+
+    @timed
+    def decompress(self, data, flags):
+        codec = flags & 0xFF
+        if codec == CODECS["zlib"]:
+            data = zlib.decompress(data)
+        elif codec == CODECS["lzma"]:
+            data = lzma.decompress(data)
+        elif codec != CODECS["none"]:
+            raise ValueError("Unknown compression {}".format(codec))
+        return data
+
+    def write(self, data, path=None):
+        if path is None:
+            path = self.path
+        folder, name = os.path.split(os.path.abspath(path))
+        handle, temp_path = tempfile.mkstemp(prefix="." + name, dir=folder)
+        try:
+            with os.fdopen(handle, "wb") as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            if os.path.exists(path):
+                shutil.copymode(path, temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    @timed
+    def derive_key(self, pw, params):
+        key = argon2.low_level.hash_secret_raw(pw, **params)
+        return base64.urlsafe_b64encode(key)
+
+    def create_header(self, params):
+        flags = CODECS[self.compression] | (self.level << 8)
+        header = HEADER.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            flags,
+            params["type"].value,
+            params["version"],
+            params["time_cost"],
+            params["memory_cost"],
+            params["parallelism"],
+            len(params["salt"]),
+        )
+        return header + params["salt"]
+
+    def parse_header(self, data):
+        if len(data) < HEADER.size:
+            raise ValueError("The file is truncated")
+        fields = HEADER.unpack_from(data)
+        magic, version, flags, type, argon_version = fields[:5]
+        time_cost, memory_cost, parallelism, salt_len = fields[5:]
+        if version != FORMAT_VERSION:
+            raise ValueError("Unsupported file version {}".format(version))
+        params = {
+            "type": argon2.low_level.Type(type),
+            "version": argon_version,
+            "salt": data[HEADER.size : HEADER.size + salt_len],
+            "time_cost": time_cost,
+            "memory_cost": memory_cost,
+            "parallelism": parallelism,
+            "hash_len": 32,
+        }
+        return (params, flags, HEADER.size + salt_len)
+
+    def decrypt(self, encrypted_data, pw):
+        params, flags, offset = self.parse_header(encrypted_data)
+        if offset + FRAME.size > len(encrypted_data):
+            raise ValueError("The file is truncated")
+        (length,) = FRAME.unpack_from(encrypted_data, offset)
+        start = offset + FRAME.size
+        if start + length > len(encrypted_data):
+            raise ValueError("The file is truncated")
+        token = encrypted_data[start : start + length]
+        key = self.derive_key(pw, params)
+        data = self.decompress(Fernet(key).decrypt(token), flags)
+        self.read_journal(encrypted_data, start + length, key)
+        return (data, params, key)
+
+    def read_journal(self, encrypted_data, offset, key):
+        fernet = Fernet(key)
+        snapshot_end = offset
+        while offset + FRAME.size <= len(encrypted_data):
+            (length,) = FRAME.unpack_from(encrypted_data, offset)
+            start = offset + FRAME.size
+            if start + length > len(encrypted_data):
+                break
+            try:
+                records = decode(fernet.decrypt(encrypted_data[start : start + length]))
+            except (InvalidToken, ValueError):
+                break
+            self.records.extend(records)
+            offset = start + length
+        self.end = offset
+        self.journal_size = offset - snapshot_end
+
+    def format_b64s(self, string):
+        if len(string) % 4 != 0:
+            while len(string) % 4 != 0:
+                string = string + "="
+        return bytes(string, "utf-8")
+
+    def get_key(self, hash):
+        return hash.split("$")[-1]
+
+    def parse_file(self, file):
+        elements = file.split("$")
+        if len(elements) != 6:
+            raise ValueError("Not a classmarks file")
+        type = elements[1]
+        if type == "argon2d":
+            index = 0
+        if type == "argon2i":
+            index = 1
+        if type == "argon2id":
+            index = 2
+        type = argon2.low_level.Type(index)
+        version = self.create_dict(elements[2])["v"]
+        settings = self.create_dict(elements[3])
+        salt = base64.b64decode(self.format_b64s(elements[4]))
+        digest = bytes(elements[5], encoding="utf-8")
+        params = {
+            "type": type,
+            "version": version,
+            "salt": salt,
+            "time_cost": settings["t"],
+            "memory_cost": settings["m"],
+            "parallelism": settings["p"],
+            "hash_len": 32,
+        }
+        return (digest, params)
+
+    def create_dict(self, string):
+        params = {}
+        if "," in string:
+            pairs = string.split(",")
+        else:
+            pairs = [string]
+        for pair in pairs:
+            key, value = pair.split("=")
+            params[key] = int(value)
+        return params
+
+    @timed
+    def decrypt_legacy(self, encrypted_data, pw):
+        digest, params = self.parse_file(encrypted_data)
+        hash = argon2.low_level.hash_secret(pw, **params).decode("utf-8")
+        key = self.format_b64s(self.get_key(hash))
+        data = Fernet(key).decrypt(digest)
+        return (data, params, key)
+
+
+if __name__ == "__main__":
+    from classmarks import Subject
+
+    e = Encryptor()
+    d = Subject()
+    d.add_student("Alex")
+    e.save(d, "Goose", "me.meow")
+    d.add_student("Karo")
+    e.resave(d)
+    try:
+        nd = e.read("me.meow", "Goose")
+        print(nd)
+    except PasswordError as e:
+        print(e)
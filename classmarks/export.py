@@ -0,0 +1,166 @@
+import csv
+import json
+import math
+import os
+
+import numpy as np
+
+ID_COLUMNS = ["class", "subject", "student", "gender"]
+FIELDS = ["group", "parent", "weight", "date"]
+CHUNK_SIZE = 1024
+FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+    ".xlsx": "xlsx",
+}
+
+
+def export(subjects, file_path, chunk_size=CHUNK_SIZE):
+    if hasattr(subjects, "marks"):
+        subjects = [subjects]
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError("Unsupported export format {}".format(extension))
+    writers = {
+        "csv": write_csv,
+        "parquet": write_parquet,
+        "arrow": write_arrow,
+        "xlsx": write_xlsx,
+    }
+    writer = writers[FORMATS[extension]]
+    names, metadata = get_columns(subjects)
+    writer(subjects, file_path, names, metadata, chunk_size)
+
+
+def get_columns(subjects):
+    names = {}
+    metadata = []
+    for subject in subjects:
+        columns = {}
+        for test in subject.tests:
+            parent = test.parent.name if test.parent is not None else ""
+            columns[test.name] = {
+                "group": test.group,
+                "parent": parent,
+                "weight": test.weight,
+                "date": test.date,
+            }
+            names.setdefault(test.name, None)
+        metadata.append(columns)
+    return (list(names), metadata)
+
+
+def iter_chunks(subjects, names, chunk_size):
+    for subject in subjects:
+        values = subject.marks.values
+        positions = [subject.marks.columns.get(name) for name in names]
+        aligned = positions == list(range(len(names)))
+        present = [index for index, pos in enumerate(positions) if pos is not None]
+        cols = [positions[index] for index in present]
+        for start in range(0, subject.n_students, chunk_size):
+            stop = min(start + chunk_size, subject.n_students)
+            if aligned:
+                block = values[start:stop]
+            else:
+                block = np.full((stop - start, len(names)), np.nan)
+                block[:, present] = values[start:stop, cols]
+            yield (subject, subject.students[start:stop], block)
+
+
+def get_ids(subject, student):
+    return [subject.grade, subject.subject_name, student.fullname, student.gender]
+
+
+def write_csv(subjects, file_path, names, metadata, chunk_size):
+    with open(file_path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file, delimiter=";")
+        padding = [""] * (len(ID_COLUMNS) - 3)
+        for subject, columns in zip(subjects, metadata):
+            ids = [subject.grade, subject.subject_name]
+            for field in FIELDS:
+                info = [columns.get(name, {}).get(field, "") for name in names]
+                writer.writerow(["#" + field] + ids + padding + info)
+        writer.writerow(ID_COLUMNS + names)
+        for subject, students, block in iter_chunks(subjects, names, chunk_size):
+            rows = block.tolist()
+            for student, row in zip(students, rows):
+                marks = ["" if math.isnan(mark) else mark for mark in row]
+                writer.writerow(get_ids(subject, student) + marks)
+
+
+def get_schema(pa, subjects, names, metadata):
+    fields = [pa.field(name, pa.string()) for name in ID_COLUMNS]
+    for name in names:
+        infos = [columns[name] for columns in metadata if name in columns]
+        info = None
+        if all(other == infos[0] for other in infos):
+            info = {field: str(infos[0][field]) for field in FIELDS}
+        fields.append(pa.field(name, pa.float64(), metadata=info))
+    info = []
+    for subject, columns in zip(subjects, metadata):
+        ids = {"class": subject.grade, "subject": subject.subject_name}
+        info.append(dict(ids, assessments=columns))
+    return pa.schema(fields, metadata={"classmarks": json.dumps({"subjects": info})})
+
+
+def iter_batches(pa, schema, subjects, names, chunk_size):
+    for subject, students, block in iter_chunks(subjects, names, chunk_size):
+        ids = [get_ids(subject, student) for student in students]
+        arrays = [pa.array(column, pa.string()) for column in zip(*ids)]
+        for index in range(len(names)):
+            arrays.append(pa.array(block[:, index], from_pandas=True))
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def import_pyarrow(file_path):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("Exporting {} needs pyarrow".format(file_path)) from None
+    return pa
+
+
+def write_parquet(subjects, file_path, names, metadata, chunk_size):
+    pa = import_pyarrow(file_path)
+    import pyarrow.parquet as pq
+
+    schema = get_schema(pa, subjects, names, metadata)
+    with pq.ParquetWriter(file_path, schema) as writer:
+        for batch in iter_batches(pa, schema, subjects, names, chunk_size):
+            writer.write_batch(batch)
+
+
+def write_arrow(subjects, file_path, names, metadata, chunk_size):
+    pa = import_pyarrow(file_path)
+
+    schema = get_schema(pa, subjects, names, metadata)
+    with pa.OSFile(file_path, "wb") as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            for batch in iter_batches(pa, schema, subjects, names, chunk_size):
+                writer.write_batch(batch)
+
+
+def write_xlsx(subjects, file_path, names, metadata, chunk_size):
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ImportError("Exporting {} needs openpyxl".format(file_path)) from None
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Marks")
+    sheet.append(ID_COLUMNS + names)
+    for subject, students, block in iter_chunks(subjects, names, chunk_size):
+        rows = block.tolist()
+        for student, row in zip(students, rows):
+            marks = [None if math.isnan(mark) else mark for mark in row]
+            sheet.append(get_ids(subject, student) + marks)
+    sheet = workbook.create_sheet("Assessments")
+    sheet.append(ID_COLUMNS[:2] + ["name"] + FIELDS)
+    for subject, columns in zip(subjects, metadata):
+        ids = [subject.grade, subject.subject_name]
+        for name, info in columns.items():
+            sheet.append(ids + [name] + [info[field] for field in FIELDS])
+    workbook.save(file_path)
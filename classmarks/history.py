@@ -0,0 +1,84 @@
+from collections import deque
+
+import numpy as np
+
+from .journal import apply
+
+DEFAULT_BUDGET = 16 * 1024 * 1024
+RECORD_SIZE = 64
+
+
+def get_size(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return RECORD_SIZE + sum(get_size(item) for item in value)
+    if isinstance(value, dict):
+        return RECORD_SIZE + sum(get_size(item) for item in value.values())
+    return 8
+
+
+class History:
+    def __init__(self, subject, budget=DEFAULT_BUDGET):
+        self.subject = subject
+        self.budget = budget
+        self.undos = deque()
+        self.redos = []
+        self.size = 0
+        self.applying = False
+        subject.history = self
+
+    def __repr__(self):
+        msg = "History(undos={}, redos={}, size={})"
+        return msg.format(len(self.undos), len(self.redos), self.size)
+
+    @property
+    def can_undo(self):
+        return bool(self.undos)
+
+    @property
+    def can_redo(self):
+        return bool(self.redos)
+
+    def push(self, forward, inverse):
+        if self.applying:
+            return
+        for entry in self.redos:
+            self.size -= entry[2]
+        self.redos = []
+        size = get_size(forward) + get_size(inverse)
+        self.undos.append((forward, inverse, size))
+        self.size += size
+        while self.undos and self.size > self.budget:
+            self.size -= self.undos.popleft()[2]
+
+    def undo(self):
+        if not self.undos:
+            return []
+        entry = self.undos.pop()
+        self.run(entry[1])
+        self.redos.append(entry)
+        return entry[1]
+
+    def redo(self):
+        if not self.redos:
+            return []
+        entry = self.redos.pop()
+        self.run(entry[0])
+        self.undos.append(entry)
+        return entry[0]
+
+    def run(self, records):
+        self.applying = True
+        try:
+            for record in records:
+                apply(self.subject, record)
+        finally:
+            self.applying = False
+
+    def clear(self):
+        self.undos.clear()
+        self.redos = []
+        self.size = 0
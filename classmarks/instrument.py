@@ -0,0 +1,138 @@
+import atexit
+import json
+import os
+import threading
+import time
+from functools import wraps
+
+ENV = "CLASSMARKS_PROFILE"
+DEFAULT_PATH = "classmarks-profile.json"
+MAX_EVENTS = 200000
+
+
+def get_path():
+    value = os.environ.get(ENV, "")
+    if value.lower() in ("", "0", "false", "no"):
+        return None
+    if value.lower() in ("1", "true", "yes"):
+        return DEFAULT_PATH
+    return value
+
+
+class Stats:
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self.buckets = [0] * 64
+
+    def __repr__(self):
+        return "Stats(name={}, count={})".format(self.name, self.count)
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        if self.min is None or duration < self.min:
+            self.min = duration
+        if duration > self.max:
+            self.max = duration
+        self.buckets[min(duration.bit_length(), 63)] += 1
+
+    def get_percentile(self, fraction):
+        target = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target and count:
+                return 1 << bucket
+        return self.max
+
+    def to_dict(self):
+        histogram = {}
+        for bucket, count in enumerate(self.buckets):
+            if count:
+                histogram["<={}".format(1 << bucket)] = count
+        return {
+            "count": self.count,
+            "total_ms": self.total / 1e6,
+            "mean_us": self.total / self.count / 1e3 if self.count else 0,
+            "min_us": (self.min or 0) / 1e3,
+            "max_us": self.max / 1e3,
+            "p50_us": self.get_percentile(0.5) / 1e3,
+            "p99_us": self.get_percentile(0.99) / 1e3,
+            "histogram_ns": histogram,
+        }
+
+
+class Recorder:
+    def __init__(self, path=None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter_ns()
+        self.stats = {}
+        self.events = []
+        self.dropped = 0
+
+    def __repr__(self):
+        return "Recorder(path={}, names={})".format(self.path, len(self.stats))
+
+    def add(self, name, start, duration):
+        with self.lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = Stats(name)
+            stats.add(duration)
+            if len(self.events) < MAX_EVENTS:
+                self.events.append((name, start, duration, threading.get_ident()))
+            else:
+                self.dropped += 1
+
+    def report(self):
+        with self.lock:
+            stats = {name: stats.to_dict() for name, stats in self.stats.items()}
+            events = list(self.events)
+            dropped = self.dropped
+        trace = []
+        for name, start, duration, thread in events:
+            trace.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - self.origin) / 1e3,
+                    "dur": duration / 1e3,
+                    "pid": os.getpid(),
+                    "tid": thread,
+                }
+            )
+        return {"stats": stats, "droppedEvents": dropped, "traceEvents": trace}
+
+    def dump(self, path=None):
+        path = path or self.path
+        with open(path, "w") as file:
+            json.dump(self.report(), file)
+        return path
+
+
+recorder = Recorder(get_path())
+enabled = recorder.path is not None
+if enabled:
+    atexit.register(recorder.dump)
+
+
+def timed(func):
+    if not enabled:
+        return func
+    name = func.__qualname__
+    clock = time.perf_counter_ns
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            recorder.add(name, start, clock() - start)
+
+    return wrapper
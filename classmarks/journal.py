@@ -0,0 +1,87 @@
+import json
+
+from .instrument import timed
+
+
+def to_json(value):
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError("{} is not JSON serializable".format(type(value).__name__))
+
+
+def encode(records):
+    data = json.dumps(records, separators=(",", ":"), default=to_json)
+    return data.encode("utf-8")
+
+
+def decode(data):
+    return json.loads(data.decode("utf-8"))
+
+
+@timed
+def replay(subject, records):
+    for index, record in enumerate(records):
+        try:
+            apply(subject, record)
+        except Exception as error:
+            subject.journal = []
+            msg = "Journal record {} could not be applied: {}"
+            raise ValueError(msg.format(index + 1, error)) from error
+    subject.journal = []
+
+
+def apply(subject, record):
+    op, *args = record
+    if op == "add_student":
+        subject.add_student(*args)
+    elif op == "add_students":
+        subject.add_students(*args)
+    elif op == "insert_student":
+        subject.insert_student(*args)
+    elif op == "edit_student":
+        name, fields = args
+        subject.edit_student(get_student(subject, name), **fields)
+    elif op == "delete_student":
+        subject.delete_student(get_student(subject, args[0]))
+    elif op == "add_ass":
+        name, parent = args
+        if parent is not None:
+            parent = get_ass(subject, parent)
+        subject.add_ass(name, parent)
+    elif op == "add_asses":
+        names, parent, weights, dates = args
+        subject.add_asses(names, get_ass(subject, parent), weights, dates)
+    elif op == "insert_ass":
+        parent, index, nodes, values = args
+        subject.insert_ass(get_ass(subject, parent), index, nodes, values)
+    elif op == "edit_ass":
+        name, fields = args
+        subject.edit_ass(get_ass(subject, name), **fields)
+    elif op == "delete_ass":
+        subject.delete_ass(get_ass(subject, args[0]))
+    elif op == "edit_mark":
+        name, ass, mark = args
+        subject.edit_mark(get_student(subject, name), get_ass(subject, ass), mark)
+    elif op == "edit_marks":
+        names, asses, marks = args
+        students = [get_student(subject, name) for name in names]
+        asses = [get_ass(subject, ass) for ass in asses]
+        subject.edit_marks(marks, students, asses)
+    elif op == "edit_subject":
+        subject.edit_subject(*args)
+    else:
+        raise ValueError("Unknown journal record {}".format(op))
+
+
+def get_student(subject, name):
+    student = subject.get_student_by_name(name)
+    if student is None:
+        raise ValueError("Unknown student {}".format(name))
+    return student
+
+
+def get_ass(subject, name):
+    ass = subject.get_ass_by_name(name)
+    if ass is None:
+        raise ValueError("Unknown assessment {}".format(name))
+    return ass
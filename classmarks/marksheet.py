@@ -1,44 +1,188 @@
-import pandas as pd
+import numpy as np
 
 
 class MarkSheet:
-    def __init__(self):
-        self.df = pd.DataFrame()
-        self.df.index.name = "Students"
-        self.df["Total"] = 0
+    def __init__(self, capacity=(16, 16)):
+        self.buffer = np.zeros(capacity)
+        self.students = []
+        self.assessments = []
+        self.rows = {}
+        self.columns = {}
+        self.add_assessment("Total")
 
     def __repr__(self):
-        return "MarkSheet(rows={}, columns={})".format(*self.df.shape)
+        return "MarkSheet(rows={}, columns={})".format(*self.shape)
 
     def __str__(self):
         return str(self.df)
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["buffer"] = self.values.copy()
+        return state
+
+    def __setstate__(self, state):
+        if "df" in state:
+            df = state["df"]
+            self.__init__()
+            self.load(list(df.index), list(df.columns), df.values)
+        else:
+            self.__dict__.update(state)
+
+    @property
+    def shape(self):
+        return (len(self.students), len(self.assessments))
+
+    @property
+    def values(self):
+        n_rows, n_cols = self.shape
+        return self.buffer[:n_rows, :n_cols]
+
+    @property
+    def df(self):
+        import pandas as pd
+
+        df = pd.DataFrame(
+            self.values.copy(), index=list(self.students), columns=self.assessments
+        )
+        df.index.name = "Students"
+        return df
+
+    def export(self, file_path):
+        self.df.to_csv(file_path, sep=";")
+
+    def load(self, students, assessments, values):
+        values = np.asarray(values, dtype=float)
+        self.buffer = np.zeros(
+            (max(len(students), 1) * 2, max(len(assessments), 1) * 2)
+        )
+        self.buffer[: len(students), : len(assessments)] = values
+        self.students = list(students)
+        self.assessments = list(assessments)
+        self.rows = self.index_labels(self.students)
+        self.columns = self.index_labels(self.assessments)
+
+    def index_labels(self, labels, start=0):
+        return {label: pos for pos, label in enumerate(labels[start:], start)}
+
+    def reserve(self, n_rows, n_cols):
+        capacity_rows, capacity_cols = self.buffer.shape
+        if n_rows > capacity_rows or n_cols > capacity_cols:
+            if n_rows > capacity_rows:
+                capacity_rows = max(n_rows, capacity_rows * 2)
+            if n_cols > capacity_cols:
+                capacity_cols = max(n_cols, capacity_cols * 2)
+            buffer = np.zeros((capacity_rows, capacity_cols))
+            old_rows, old_cols = self.shape
+            buffer[:old_rows, :old_cols] = self.values
+            self.buffer = buffer
+
+    def row(self, name):
+        return self.rows[name]
+
+    def column(self, assessment):
+        return self.columns[assessment]
+
     def add_student(self, name):
-        self.df.loc[name] = 0
+        n_rows, n_cols = self.shape
+        self.reserve(n_rows + 1, n_cols)
+        self.buffer[n_rows, :] = 0
+        self.students.append(name)
+        self.rows[name] = n_rows
+
+    def add_students(self, names):
+        n_rows, n_cols = self.shape
+        self.reserve(n_rows + len(names), n_cols)
+        self.buffer[n_rows : n_rows + len(names), :] = 0
+        self.students.extend(names)
+        self.rows.update(self.index_labels(self.students, n_rows))
 
     def delete_student(self, name):
-        self.df.drop(name, axis=0, inplace=True)
+        pos = self.rows.pop(name)
+        n_rows, n_cols = self.shape
+        self.buffer[pos : n_rows - 1] = self.buffer[pos + 1 : n_rows]
+        del self.students[pos]
+        self.rows.update(self.index_labels(self.students, pos))
+
+    def insert_student(self, pos, name, row):
+        n_rows, n_cols = self.shape
+        self.reserve(n_rows + 1, n_cols)
+        self.buffer[pos + 1 : n_rows + 1] = self.buffer[pos:n_rows]
+        self.buffer[pos, :] = 0
+        self.buffer[pos, :n_cols] = row
+        self.students.insert(pos, name)
+        self.rows.update(self.index_labels(self.students, pos))
 
     def edit_student(self, name, new_name):
-        self.df.rename(index={name: new_name}, inplace=True)
+        pos = self.rows.pop(name)
+        self.students[pos] = new_name
+        self.rows[new_name] = pos
 
     def add_assessment(self, assessment):
-        self.df[assessment] = 0
+        n_rows, n_cols = self.shape
+        self.reserve(n_rows, n_cols + 1)
+        self.buffer[:, n_cols] = 0
+        self.assessments.append(assessment)
+        self.columns[assessment] = n_cols
+
+    def add_assessments(self, assessments):
+        n_rows, n_cols = self.shape
+        self.reserve(n_rows, n_cols + len(assessments))
+        self.buffer[:, n_cols : n_cols + len(assessments)] = 0
+        self.assessments.extend(assessments)
+        self.columns.update(self.index_labels(self.assessments, n_cols))
+
+    def insert_assessments(self, pos, assessments, block):
+        n_rows, n_cols = self.shape
+        n_new = len(assessments)
+        self.reserve(n_rows, n_cols + n_new)
+        self.buffer[:, pos + n_new : n_cols + n_new] = self.buffer[:, pos:n_cols]
+        self.buffer[:, pos : pos + n_new] = 0
+        block = np.asarray(block, dtype=float).reshape(n_rows, n_new)
+        self.buffer[:n_rows, pos : pos + n_new] = block
+        self.assessments[pos:pos] = assessments
+        self.columns.update(self.index_labels(self.assessments, pos))
 
     def delete_assessment(self, assessment):
-        self.df.drop(assessment, axis=1, inplace=True)
+        pos = self.columns.pop(assessment)
+        n_rows, n_cols = self.shape
+        self.buffer[:, pos : n_cols - 1] = self.buffer[:, pos + 1 : n_cols]
+        del self.assessments[pos]
+        self.columns.update(self.index_labels(self.assessments, pos))
 
     def edit_assessment(self, assessment, new_assessment):
-        self.df.rename(columns={assessment: new_assessment}, inplace=True)
+        pos = self.columns.pop(assessment)
+        self.assessments[pos] = new_assessment
+        self.columns[new_assessment] = pos
+
+    def get_mark(self, name, assessment):
+        return self.buffer[self.rows[name], self.columns[assessment]]
 
     def edit_mark(self, name, assessment, mark):
-        self.df.loc[name, assessment] = mark
+        if mark is None:
+            mark = np.nan
+        self.buffer[self.rows[name], self.columns[assessment]] = mark
+
+    def edit_marks(self, names, assessments, marks):
+        rows = [self.rows[name] for name in names]
+        cols = [self.columns[assessment] for assessment in assessments]
+        marks = np.asarray(marks, dtype=float)
+        if marks.ndim == 2:
+            self.buffer[np.ix_(rows, cols)] = marks
+        else:
+            self.buffer[rows, cols] = marks
+        return rows, cols
 
     def reorder_assessments(self, names):
-        self.df = self.df[names]
+        order = [self.columns[name] for name in names]
+        n_rows = len(self.students)
+        self.buffer[:n_rows, : len(order)] = self.buffer[:n_rows, order]
+        self.assessments = list(names)
+        self.columns = self.index_labels(self.assessments)
 
     def reorder_students(self, names):
-        self.df = self.df.loc[names]
-
-    def export(self, file_path):
-        self.df.to_csv(file_path, sep=";")
+        order = [self.rows[name] for name in names]
+        n_cols = len(self.assessments)
+        self.buffer[: len(order), :n_cols] = self.buffer[order, :n_cols]
+        self.students = list(names)
+        self.rows = self.index_labels(self.students)
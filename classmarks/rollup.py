@@ -0,0 +1,158 @@
+import numpy as np
+
+
+class Level:
+    def __init__(self, kind, parents, children, weights, members):
+        self.kind = kind
+        self.parents = np.array(parents, dtype=int)
+        self.children = np.array(children, dtype=int)
+        self.weights = weights
+        self.members = members
+        self.sizes = members.sum(axis=0)
+        self.sums = None
+        self.counts = None
+
+    def __repr__(self):
+        msg = "Level(kind={}, parents={}, children={})"
+        return msg.format(self.kind, len(self.parents), len(self.children))
+
+    def aggregate(self, block, slots=slice(None)):
+        present = (block != 0) & ~np.isnan(block)
+        block = np.where(present, block, 0.0)
+        counts = present @ self.members[:, slots]
+        if self.kind == "mean":
+            sums = block @ self.members[:, slots]
+            result = np.zeros_like(sums)
+            np.divide(sums, counts, out=result, where=counts > 0)
+        else:
+            sums = block @ self.weights[:, slots]
+            result = np.where(counts == self.sizes[slots], sums, np.nan)
+        return sums, counts, result
+
+    def get_value(self, row, slot):
+        count = self.counts[row, slot]
+        if self.kind == "mean":
+            value = 0.0
+            if count > 0:
+                value = self.sums[row, slot] / count
+        else:
+            value = np.nan
+            if count == self.sizes[slot]:
+                value = self.sums[row, slot]
+        return value
+
+
+class Rollup:
+    def __init__(self, tests):
+        self.tests = tests
+        self.parents = {}
+        self.levels = self.compile(tests)
+        self.computed = False
+
+    def __repr__(self):
+        return "Rollup(levels={})".format(len(self.levels))
+
+    def compile(self, tests):
+        groups = {}
+        for parent in tests:
+            if parent.children:
+                key = (parent.depth, self.get_kind(parent))
+                groups.setdefault(key, []).append(parent)
+        levels = []
+        for depth, kind in sorted(groups, reverse=True):
+            parents = groups[(depth, kind)]
+            children = [child for parent in parents for child in parent.children]
+            weights = np.zeros((len(children), len(parents)))
+            members = np.zeros((len(children), len(parents)))
+            row = 0
+            for col, parent in enumerate(parents):
+                for child in parent.children:
+                    weights[row, col] = child.weight
+                    members[row, col] = 1.0
+                    row += 1
+            level = Level(
+                kind,
+                [tests.get_index(parent) for parent in parents],
+                [tests.get_index(child) for child in children],
+                weights,
+                members,
+            )
+            for row, child in enumerate(children):
+                slot = int(members[row].argmax())
+                factor = 1.0
+                if kind == "sum":
+                    factor = child.weight
+                self.parents[level.children[row]] = (
+                    level.parents[slot],
+                    level,
+                    slot,
+                    factor,
+                )
+            levels.append(level)
+        return levels
+
+    def get_kind(self, parent):
+        kind = "sum"
+        if parent.group == "sub":
+            kind = "mean"
+        return kind
+
+    def compute(self, values):
+        for level in self.levels:
+            sums, counts, result = level.aggregate(values[:, level.children])
+            values[:, level.parents] = result
+            level.sums = sums
+            level.counts = counts
+        self.computed = True
+        return values
+
+    def refresh(self, values, rows, columns):
+        if not self.computed:
+            return self.compute(values)
+        parents = self.get_ancestors(columns)
+        rows = np.unique(rows)
+        for level in self.levels:
+            slots = np.flatnonzero(np.isin(level.parents, parents))
+            if len(slots):
+                block = values[np.ix_(rows, level.children)]
+                sums, counts, result = level.aggregate(block, slots)
+                level.sums[np.ix_(rows, slots)] = sums
+                level.counts[np.ix_(rows, slots)] = counts
+                values[np.ix_(rows, level.parents[slots])] = result
+        return values
+
+    def get_ancestors(self, columns):
+        ancestors = set()
+        for col in columns:
+            while col in self.parents:
+                col = self.parents[col][0]
+                if col in ancestors:
+                    break
+                ancestors.add(col)
+        return sorted(ancestors)
+
+    def update(self, values, row, col, mark):
+        if mark is None:
+            mark = np.nan
+        old = values[row, col]
+        values[row, col] = mark
+        changed = [col]
+        while col in self.parents:
+            parent, level, slot, factor = self.parents[col]
+            if self.is_present(old):
+                level.sums[row, slot] -= old * factor
+                level.counts[row, slot] -= 1
+            if self.is_present(mark):
+                level.sums[row, slot] += mark * factor
+                level.counts[row, slot] += 1
+            old = values[row, parent]
+            mark = level.get_value(row, slot)
+            if old == mark or (np.isnan(old) and np.isnan(mark)):
+                break
+            values[row, parent] = mark
+            changed.append(parent)
+            col = parent
+        return changed
+
+    def is_present(self, mark):
+        return bool(mark != 0 and not np.isnan(mark))
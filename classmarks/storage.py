@@ -0,0 +1,99 @@
+import struct
+
+import numpy as np
+
+from .instrument import timed
+from .subject import Subject, Student
+from .testtree import Assessment
+
+VERSION = 1
+HEADER = struct.Struct("<HIIIIII")
+GROUPS = ["root", "major", "sub", "test"]
+
+
+@timed
+def pack(subject):
+    tests = list(subject.tests)
+    positions = {test: index for index, test in enumerate(tests)}
+    parents = [positions.get(test.parent, -1) for test in tests]
+    strings = [subject.grade, subject.subject_name]
+    strings += [test.name for test in tests] + [test.date for test in tests]
+    strings += [student.fullname for student in subject.students]
+    strings += [student.gender for student in subject.students]
+    encoded = [string.encode("utf-8") for string in strings]
+    chunks = [
+        HEADER.pack(
+            VERSION,
+            subject.student_suffix,
+            subject.tests.major_suffix,
+            subject.tests.sub_suffix,
+            subject.tests.test_suffix,
+            len(tests),
+            len(subject.students),
+        ),
+        np.array(parents, dtype="<i4").tobytes(),
+        np.array([test.weight for test in tests], dtype="<f8").tobytes(),
+        np.array([GROUPS.index(test.group) for test in tests], dtype="u1").tobytes(),
+        np.array([len(string) for string in encoded], dtype="<u4").tobytes(),
+        b"".join(encoded),
+    ]
+    size = sum(len(chunk) for chunk in chunks)
+    chunks.append(bytes(-size % 8))
+    chunks.append(np.ascontiguousarray(subject.marks.values, dtype="<f8").tobytes())
+    return b"".join(chunks)
+
+
+@timed
+def unpack(data):
+    view = memoryview(data)
+    header = HEADER.unpack_from(view)
+    version, student_suffix, major, sub, test, n_tests, n_students = header
+    if version != VERSION:
+        raise ValueError("Unsupported marks format version {}".format(version))
+    offset = HEADER.size
+    parents = np.frombuffer(view, "<i4", n_tests, offset)
+    offset += parents.nbytes
+    weights = np.frombuffer(view, "<f8", n_tests, offset)
+    offset += weights.nbytes
+    groups = np.frombuffer(view, "u1", n_tests, offset)
+    offset += groups.nbytes
+    n_strings = 2 + 2 * n_tests + 2 * n_students
+    lengths = np.frombuffer(view, "<u4", n_strings, offset)
+    offset += lengths.nbytes
+    strings = []
+    for length in lengths.tolist():
+        strings.append(str(view[offset : offset + length], "utf-8"))
+        offset += length
+    offset += -offset % 8
+    marks = np.frombuffer(view, "<f8", n_students * n_tests, offset)
+
+    grade, subject_name = strings[:2]
+    names = strings[2 : 2 + n_tests]
+    dates = strings[2 + n_tests : 2 + 2 * n_tests]
+    fullnames = strings[2 + 2 * n_tests : 2 + 2 * n_tests + n_students]
+    genders = strings[2 + 2 * n_tests + n_students :]
+
+    subject = Subject(grade, subject_name)
+    subject.student_suffix = student_suffix
+    tree = subject.tests
+    tree.name = names[0]
+    tree.weight = float(weights[0])
+    tree.date = dates[0]
+    tree.major_suffix, tree.sub_suffix, tree.test_suffix = major, sub, test
+    nodes = [tree]
+    for index in range(1, n_tests):
+        node = Assessment(
+            names[index],
+            GROUPS[groups[index]],
+            nodes[parents[index]],
+            float(weights[index]),
+            dates[index],
+        )
+        nodes.append(node)
+    tree.invalidate()
+    subject.students = [
+        Student(fullname, gender) for fullname, gender in zip(fullnames, genders)
+    ]
+    subject.student_names = {student.fullname: student for student in subject.students}
+    subject.marks.load(fullnames, names, marks.reshape(n_students, n_tests))
+    return subject
@@ -1,5 +1,11 @@
-from .testtree import TestTree
+import copy
+
+import numpy as np
+
+from .instrument import timed
+from .testtree import Assessment, TestTree
 from .marksheet import MarkSheet
+from .rollup import Rollup
 
 
 class Student:
@@ -25,111 +31,361 @@ class Subject:
         self.subject_name = subject_name
         self.student_suffix = 1
         self.cls = self.__class__.__name__
+        self.journal = []
+        self.history = None
         self.new()
 
     def __repr__(self):
         msg = "{}(Grade={}, Subject Name={}, Number of Students={})"
         return msg.format(self.cls, self.grade, self.subject_name, self.n_students)
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["rollup"] = None
+        state["journal"] = []
+        state["history"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.rollup = None
+        self.version = 0
+        self.journal = []
+        self.history = None
+        self.student_names = {student.fullname: student for student in self.students}
+
+    def copy(self):
+        return copy.deepcopy(self)
+
     def new(self):
         self.students = []
+        self.student_names = {}
         self.marks = MarkSheet()
         self.tests = TestTree()
+        self.rollup = None
+        self.version = 0
 
     def export(self, file_path):
-        self.marks.export(file_path)
+        from .export import export
+
+        export(self, file_path)
+
+    def record(self, op, *args):
+        self.journal.append([op, *args])
+
+    def remember(self, forward, inverse):
+        if self.history is not None:
+            self.history.push(forward, inverse)
+
+    def take_journal(self):
+        records = self.journal
+        self.journal = []
+        return records
+
+    def edit_subject(self, grade=None, subject_name=None):
+        inverse = ["edit_subject", self.grade, self.subject_name]
+        if grade is not None:
+            self.grade = grade
+        if subject_name is not None:
+            self.subject_name = subject_name
+        self.record("edit_subject", grade, subject_name)
+        self.remember([["edit_subject", grade, subject_name]], [inverse])
 
     def add_student(self, name=None, gender=None):
+        given = (name, gender)
         if name is None:
             name = "Unnamed {}".format(self.student_suffix)
             self.student_suffix += 1
         if gender is None:
             gender = "male"
         student = Student(name, gender)
+        self.version += 1
         self.students.append(student)
+        self.student_names[name] = student
         self.marks.add_student(name)
+        self.rollup = None
+        self.record("add_student", *given)
+        self.remember([["add_student", name, gender]], [["delete_student", name]])
+
+    def add_students(self, names, genders=None):
+        names = list(names)
+        if genders is None:
+            genders = ["male"] * len(names)
+        genders = list(genders)
+        if len(genders) != len(names):
+            raise ValueError("Expected one gender per student")
+        if len(set(names)) != len(names):
+            raise ValueError("Student names must be unique")
+        for name in names:
+            if name in self.student_names:
+                raise ValueError("Student {} already exists".format(name))
+        self.version += 1
+        students = [Student(name, gender) for name, gender in zip(names, genders)]
+        self.students.extend(students)
+        self.student_names.update(zip(names, students))
+        self.marks.add_students(names)
+        self.rollup = None
+        self.record("add_students", names, genders)
+        self.remember(
+            [["add_students", names, genders]],
+            [["delete_student", name] for name in reversed(names)],
+        )
+        return students
 
     def get_student_by_name(self, name):
-        for student in self.students:
-            if student.fullname == name:
-                return student
+        return self.student_names.get(name)
+
+    def get_ass_by_name(self, name):
+        return self.tests.get_names().get(name)
+
+    def insert_student(self, position, name, gender, row):
+        if name in self.student_names:
+            raise ValueError("Student {} already exists".format(name))
+        self.version += 1
+        student = Student(name, gender)
+        self.students.insert(position, student)
+        self.student_names[name] = student
+        self.marks.insert_student(position, name, row)
+        self.rollup = None
+        self.record("insert_student", position, name, gender, row)
+        self.remember(
+            [["insert_student", position, name, gender, row]],
+            [["delete_student", name]],
+        )
+        return student
 
     def edit_student(self, student, name=None, gender=None):
+        old_name = student.fullname
+        if name:
+            inverse = {"name": student.fullname, "gender": None}
+        else:
+            inverse = {"name": None, "gender": student.gender}
+        self.version += 1
         if name:
             self.marks.edit_student(student.fullname, name)
+            if self.student_names.get(student.fullname) is student:
+                del self.student_names[student.fullname]
+            self.student_names[name] = student
             student.fullname = name
         else:
             student.gender = gender
+        self.record("edit_student", old_name, {"name": name, "gender": gender})
+        self.remember(
+            [["edit_student", old_name, {"name": name, "gender": gender}]],
+            [["edit_student", student.fullname, inverse]],
+        )
 
     def delete_student(self, student):
+        if self.history is not None:
+            position = self.marks.row(student.fullname)
+            row = self.marks.values[position].copy()
+        self.version += 1
         self.marks.delete_student(student.fullname)
+        if self.student_names.get(student.fullname) is student:
+            del self.student_names[student.fullname]
         self.students.remove(student)
+        self.rollup = None
+        self.record("delete_student", student.fullname)
+        if self.history is not None:
+            self.remember(
+                [["delete_student", student.fullname]],
+                [["insert_student", position, student.fullname, student.gender, row]],
+            )
 
     def add_ass(self, name=None, parent=None):
+        parent_name = parent.name if parent is not None else None
+        self.version += 1
         ass = self.tests.add(name, parent)
         self.marks.add_assessment(ass.name)
         names = [test.name for test in self.tests]
-        self.marks.reorder_assessments(names)
+        if names != self.marks.assessments:
+            self.marks.reorder_assessments(names)
+        self.rollup = None
+        self.record("add_ass", name, parent_name)
+        self.remember([["add_ass", ass.name, parent_name]], [["delete_ass", ass.name]])
         return ass
 
+    def add_asses(self, names, parent=None, weights=None, dates=None):
+        names = list(names)
+        given_names = list(names)
+        if parent is None:
+            parent = self.tests
+        if weights is None:
+            weights = [1.0] * len(names)
+        if dates is None:
+            dates = [""] * len(names)
+        weights = list(weights)
+        dates = list(dates)
+        if len(weights) != len(names) or len(dates) != len(names):
+            raise ValueError("Expected one weight and date per assessment")
+        if parent.root is not self.tests or parent.group == "test":
+            raise ValueError("Cannot add assessments to {}".format(parent.name))
+        given = [name for name in names if name is not None]
+        if len(set(given)) != len(given):
+            raise ValueError("Assessment names must be unique")
+        for name in given:
+            if self.tests.check_collision(name):
+                raise ValueError("Assessment {} already exists".format(name))
+        self.version += 1
+        asses = []
+        for name, weight, date in zip(names, weights, dates):
+            ass = self.tests.add(name, parent)
+            ass.update(weight=weight, date=date)
+            asses.append(ass)
+        self.marks.add_assessments([ass.name for ass in asses])
+        names = [test.name for test in self.tests]
+        if names != self.marks.assessments:
+            self.marks.reorder_assessments(names)
+        self.rollup = None
+        self.record("add_asses", given_names, parent.name, weights, dates)
+        self.remember(
+            [["add_asses", [ass.name for ass in asses], parent.name, weights, dates]],
+            [["delete_ass", ass.name] for ass in reversed(asses)],
+        )
+        return asses
+
     def get_ass_next_index(self, parent):
         n_descendants = len(parent.descendants)
         return n_descendants
 
+    def insert_ass(self, parent, index, nodes, values):
+        for name, group, weight, date, parent_name in nodes:
+            if self.tests.check_collision(name):
+                raise ValueError("Assessment {} already exists".format(name))
+        self.version += 1
+        created = {}
+        for name, group, weight, date, parent_name in nodes:
+            node_parent = created.get(parent_name)
+            created[name] = Assessment(name, group, node_parent, weight, date)
+        first = created[nodes[0][0]]
+        siblings = list(parent.children)
+        siblings.insert(index, first)
+        parent.children = siblings
+        self.tests.invalidate()
+        position = self.tests.get_index(first)
+        self.marks.insert_assessments(position, [node[0] for node in nodes], values)
+        self.rollup = None
+        self.record("insert_ass", parent.name, index, nodes, values)
+        self.remember(
+            [["insert_ass", parent.name, index, nodes, values]],
+            [["delete_ass", first.name]],
+        )
+        return first
+
     def edit_ass(self, ass, **kwargs):
+        old_name = ass.name
+        inverse = {key: getattr(ass, key) for key in kwargs}
+        self.version += 1
         if "name" in kwargs:
             self.marks.edit_assessment(ass.name, kwargs["name"])
         self.tests.edit(ass, **kwargs)
         if "weight" in kwargs:
-            for student in self.students:
-                self.propagate_mark(student, ass)
+            self.rollup = None
+            self.calc_scores()
+        self.record("edit_ass", old_name, kwargs)
+        self.remember(
+            [["edit_ass", old_name, kwargs]], [["edit_ass", ass.name, inverse]]
+        )
 
     def delete_ass(self, ass):
+        name = ass.name
+        self.version += 1
         deleted = self.tests.get_family(ass)
         deleted_indexes = [self.tests.get_index(ass) for ass in deleted]
+        if self.history is not None:
+            nodes = [
+                [node.name, node.group, node.weight, node.date, node.parent.name]
+                for node in deleted
+            ]
+            start = deleted_indexes[0]
+            values = self.marks.values[:, start : start + len(deleted)].copy()
+            index = ass.parent.children.index(ass)
+            inverse = ["insert_ass", ass.parent.name, index, nodes, values]
         deleted_asses = self.tests.delete(ass)
         self.marks.delete_assessment(ass.name)
         for ass in deleted_asses:
             self.marks.delete_assessment(ass.name)
+        self.rollup = None
+        self.record("delete_ass", name)
+        if self.history is not None:
+            self.remember([["delete_ass", name]], [inverse])
         return deleted_indexes
 
     def get_mark(self, student, ass):
-        mark = self.marks.df[ass.name][student.fullname]
-        return mark
+        return self.marks.get_mark(student.fullname, ass.name)
+
+    def get_marks(self, ass):
+        return self.marks.values[:, self.marks.column(ass.name)]
+
+    def get_rollup(self):
+        if self.rollup is None:
+            self.rollup = Rollup(self.tests)
+        return self.rollup
 
+    @timed
+    def calc_scores(self):
+        self.get_rollup().compute(self.marks.values)
+
+    @timed
     def edit_mark(self, student, ass, new_mark):
-        self.marks.edit_mark(student.fullname, ass.name, new_mark)
-        parent = ass.parent
-        parent_mark = self.calc_test_scores(student, parent)
-        if parent_mark:
-            self.marks.edit_mark(student.fullname, parent.name, parent_mark)
-            self.propagate_mark(student, parent)
-
-    def propagate_mark(self, student, ass):
-        while ass.parent:
-            parent = ass.parent
-            marks = []
-            new_mark = None
-            for child in parent.children:
-                mark = self.get_mark(student, child)
-                if mark:
-                    marks.append(mark * child.weight)
-            if len(marks) == len(parent.children):
-                new_mark = sum(marks)
-            self.marks.edit_mark(student.fullname, parent.name, new_mark)
-            ass = parent
-
-    def calc_test_scores(self, student, parent):
-        tests = list(parent.children)
-        scores = []
-        result = None
-        for test in tests:
-            mark = self.get_mark(student, test)
-            if mark:
-                scores.append(mark)
-        if scores:
-            result = sum(scores) / len(scores)
-        return result
+        self.version += 1
+        row = self.marks.row(student.fullname)
+        col = self.marks.column(ass.name)
+        old_mark = float(self.marks.values[row, col])
+        rollup = self.get_rollup()
+        if not rollup.computed:
+            rollup.compute(self.marks.values)
+        changed = rollup.update(self.marks.values, row, col, new_mark)
+        self.record("edit_mark", student.fullname, ass.name, new_mark)
+        self.remember(
+            [["edit_mark", student.fullname, ass.name, new_mark]],
+            [["edit_mark", student.fullname, ass.name, old_mark]],
+        )
+        return changed
+
+    @timed
+    def edit_marks(self, marks, students=None, asses=None):
+        if students is None:
+            entries = list(marks)
+            students = [entry[0] for entry in entries]
+            asses = [entry[1] for entry in entries]
+            marks = [entry[2] for entry in entries]
+        marks = np.array(marks, dtype=float)
+        shape = (len(students),)
+        if marks.ndim == 2:
+            shape = (len(students), len(asses))
+        elif len(asses) != len(students):
+            raise ValueError("Expected one assessment per mark")
+        if marks.shape != shape:
+            raise ValueError("Expected marks of shape {}".format(shape))
+        if not np.isfinite(marks).all():
+            raise ValueError("Marks must be finite numbers")
+        for student in set(students):
+            if student.fullname not in self.marks.rows:
+                raise ValueError("Unknown student {}".format(student.fullname))
+        for ass in set(asses):
+            if ass.root is not self.tests or ass.group != "test":
+                raise ValueError("{} is not an editable test".format(ass.name))
+        if not marks.size:
+            return []
+        self.version += 1
+        names = [student.fullname for student in students]
+        ass_names = [ass.name for ass in asses]
+        if self.history is not None:
+            rows = [self.marks.row(name) for name in names]
+            cols = [self.marks.column(name) for name in ass_names]
+            if marks.ndim == 2:
+                old = self.marks.values[np.ix_(rows, cols)]
+            else:
+                old = self.marks.values[rows, cols]
+            inverse = ["edit_marks", names, ass_names, np.nan_to_num(old)]
+        rows, cols = self.marks.edit_marks(names, [ass.name for ass in asses], marks)
+        rollup = self.get_rollup()
+        rollup.refresh(self.marks.values, rows, cols)
+        self.record("edit_marks", names, ass_names, marks.tolist())
+        if self.history is not None:
+            self.remember([["edit_marks", names, ass_names, marks]], [inverse])
+        return sorted(set(cols) | set(rollup.get_ancestors(cols)))
 
     def is_editable(self, row):
         group = self.tests[row].group
@@ -158,14 +414,12 @@ class Subject:
         return value
 
     def val_student_name(self, name, row):
-        names = [student.fullname for student in self.students]
-        names.pop(row)
-        return bool(name not in names)
+        student = self.student_names.get(name)
+        return bool(student is None or student is self.students[row])
 
     def val_test_name(self, name, row):
-        names = [test.name for test in self.tests]
-        names.pop(row)
-        return bool(name not in names)
+        test = self.get_ass_by_name(name)
+        return bool(test is None or test is self.tests[row])
 
     @property
     def n_students(self):
@@ -34,11 +34,39 @@ class TestTree(NodeMixin):
         self.sub_suffix = 1
         self.test_suffix = 1
         self.cls = self.__class__.__name__
+        self.invalidate()
 
     def __repr__(self):
         msg = "{}(name={}, group={})"
         return msg.format(self.cls, self.name, self.group)
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["nodes"] = None
+        state["positions"] = None
+        state["names"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.invalidate()
+
+    def invalidate(self):
+        self.nodes = None
+        self.positions = None
+        self.names = None
+
+    def get_nodes(self):
+        if self.nodes is None:
+            self.nodes = list(PreOrderIter(self))
+            self.positions = {node: index for index, node in enumerate(self.nodes)}
+        return self.nodes
+
+    def get_names(self):
+        if self.names is None:
+            self.names = {node.name: node for node in self.get_nodes()}
+        return self.names
+
     def add(self, name=None, parent=None):
         if not parent or parent == self:
             parent = self
@@ -46,15 +74,21 @@ class TestTree(NodeMixin):
         if name is None:
             name = self.get_name(parent, group)
         new_node = Assessment(name, group, parent)
+        self.invalidate()
         return new_node
 
     def delete(self, node):
         deleted_nodes = node.descendants
         node.parent = None
         del node
+        self.invalidate()
         return deleted_nodes
 
     def edit(self, node, **kwargs):
+        if "name" in kwargs and self.names is not None:
+            if self.names.get(node.name) is node:
+                del self.names[node.name]
+            self.names[kwargs["name"]] = node
         node.update(**kwargs)
         return kwargs
 
@@ -64,8 +98,7 @@ class TestTree(NodeMixin):
         return " ".join((group, num))
 
     def check_collision(self, name):
-        names = [test.name for test in self]
-        return bool(name in names)
+        return bool(name in self.get_names())
 
     def get_group(self, parent):
         group = ""
@@ -78,10 +111,8 @@ class TestTree(NodeMixin):
         return group
 
     def get_index(self, ass):
-        for index, item in enumerate(self):
-            if item == ass:
-                break
-        return index
+        self.get_nodes()
+        return self.positions[ass]
 
     def get_family(self, parent):
         family = [parent, *parent.descendants]
@@ -105,10 +136,10 @@ class TestTree(NodeMixin):
         return RenderTree(self, style=AsciiStyle())
 
     def __iter__(self):
-        return PreOrderIter(self)
+        return iter(self.get_nodes())
 
     def __len__(self):
-        return len(self.descendants) + 1
+        return len(self.get_nodes())
 
     def __getitem__(self, index):
-        return list(self)[index]
+        return self.get_nodes()[index]
@@ -1,21 +1,43 @@
+import os
 import sys
-from PyQt5.QtCore import QDir
-from PyQt5.QtWidgets import QApplication
-from .mainwindow import MainWindow
+
+from .startup import StartupProfile
 
 
 def main():
+    args = sys.argv[1:]
+    profile = StartupProfile("--profile-startup" in args)
+    for arg in args:
+        if arg == "--profile" or arg.startswith("--profile="):
+            os.environ["CLASSMARKS_PROFILE"] = arg.partition("=")[2] or "1"
+    args = [arg for arg in args if not arg.startswith("--profile")]
     filepath = None
-    if len(sys.argv) > 1:
-        filepath = sys.argv[1]
+    if args:
+        filepath = args[0]
+    with profile.phase("import PyQt5"):
+        from PyQt5.QtCore import QDir, QStandardPaths
+        from PyQt5.QtWidgets import QApplication
+    with profile.phase("import classmarks"):
+        import classmarks
+    with profile.phase("import mainwindow"):
+        from .mainwindow import MainWindow
     app_path = QDir().currentPath()
-    app = QApplication(sys.argv)
-    mainwindow = MainWindow(app, app_path, filepath)
-    screen = app.desktop().screenGeometry()
-    x = (screen.width() - mainwindow.width()) / 2
-    y = (screen.height() - mainwindow.height()) / 2
-    mainwindow.move(x, y)
-    mainwindow.show()
+    with profile.phase("QApplication"):
+        app = QApplication(sys.argv)
+    cache_dir = QStandardPaths.writableLocation(QStandardPaths.CacheLocation)
+    if cache_dir:
+        cache_dir = os.path.join(cache_dir, "pixmaps")
+    mainwindow = MainWindow(app, app_path, filepath, cache_dir, profile)
+    with profile.phase("first frame"):
+        screen = app.desktop().screenGeometry()
+        x = (screen.width() - mainwindow.width()) // 2
+        y = (screen.height() - mainwindow.height()) // 2
+        mainwindow.move(x, y)
+        mainwindow.show()
+        app.processEvents()
+    if profile.enabled:
+        profile.report()
+        return
     app.exec_()
 
 
@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from functools import partial
 
 from PyQt5.QtCore import Qt, QSize, QEvent
@@ -10,11 +11,35 @@ from PyQt5.QtWidgets import (
     QLabel,
     QPushButton,
 )
-from PyQt5.QtGui import QFont, QDoubleValidator, QPen
+from PyQt5.QtGui import QFont, QDoubleValidator, QPen, QFontMetrics
+
+from classmarks.instrument import timed
 
 from .dialogs import CatDialog
 
 
+class LayoutCache:
+    def __init__(self, size=4096):
+        self.size = size
+        self.sizes = OrderedDict()
+
+    def get_size(self, text, font):
+        key = (text, font.key())
+        size = self.sizes.get(key)
+        if size is None:
+            rect = QFontMetrics(font).tightBoundingRect(text)
+            size = (rect.width(), rect.height())
+            self.sizes[key] = size
+            if len(self.sizes) > self.size:
+                self.sizes.popitem(last=False)
+        else:
+            self.sizes.move_to_end(key)
+        return size
+
+
+layout_cache = LayoutCache()
+
+
 class StudentDelegate(QItemDelegate):
     def __init__(self, resources, selected_row, validator, parent=None):
         super().__init__(parent)
@@ -55,6 +80,7 @@ class StudentDelegate(QItemDelegate):
                         self.selected_row(clear=True)
         return False
 
+    @timed
     def paint(self, painter, option, index):
         name = index.data().fullname
         gender = index.data().gender
@@ -63,7 +89,7 @@ class StudentDelegate(QItemDelegate):
             pic = self.female
         painter.save()
         painter.setFont(self.font)
-        text_h = painter.fontMetrics().tightBoundingRect(name).height()
+        text_w, text_h = layout_cache.get_size(name, self.font)
         y_text = ((self.h - text_h) // 2) + text_h
         painter.setPen(self.colors["DARKGREY"])
         if option.state & QStyle.State_Selected:
@@ -135,13 +161,13 @@ class TestDelegate(QItemDelegate):
         self.img_h = self.paws.height()
         self.x_text = self.w // 4
 
+    @timed
     def paint(self, painter, option, index):
         name = index.data().name
         group = index.data().group
         color = self.colors[group]
         size = self.sizes[group]
         painter.save()
-        text_h = painter.fontMetrics().tightBoundingRect(name).height()
         painter.fillRect(
             option.rect.x() + 2, self.h - size, option.rect.width() - 4, size, color
         )
@@ -153,7 +179,7 @@ class TestDelegate(QItemDelegate):
             painter.setFont(self.weight_font)
             painter.setPen(self.qcolors["DARKGREY"])
             weight = index.data().weight
-            w = painter.fontMetrics().tightBoundingRect(weight).width()
+            w, h = layout_cache.get_size(weight, self.weight_font)
             painter.drawText(
                 option.rect.x() + ((self.w - w) // 2), self.h - size - 4, weight
             )
@@ -292,12 +318,12 @@ class MarksDelegate(QItemDelegate):
                 self.selected_row(index.row(), True)
         return False
 
+    @timed
     def paint(self, painter, option, index):
-        value = self.format_number(index.data())
+        value = index.data()
         painter.save()
         painter.setFont(self.font)
-        text_h = painter.fontMetrics().tightBoundingRect(value).height()
-        text_w = painter.fontMetrics().tightBoundingRect(value).width()
+        text_w, text_h = layout_cache.get_size(value, self.font)
         y_text = ((self.h - text_h) // 2) + text_h
         x_text = (self.w - text_w) // 2
         if index.flags() != Qt.NoItemFlags:
@@ -362,15 +388,6 @@ class MarksDelegate(QItemDelegate):
             option.rect.height() - 6,
         )
 
-    def format_number(self, text):
-        if text == "nan":
-            text = "0,0"
-        if len(text) > 2:
-            num = float(text.replace(",", "."))
-            num = round(num, 2)
-            text = str(num).replace(".", ",")
-        return text
-
     def update_model(self, index, line_edit):
         model = index.model()
         model.setData(index, line_edit.text())
@@ -96,8 +96,15 @@ class CheckPasswordDialog(QDialog):
         self.setLayout(layout)
 
     def ok_clicked(self):
-        valid = self.val_func(self.filepath, self.pw.text())
-        if not valid:
+        self.txt.setText("Checking password...")
+        self.ok_button.setEnabled(False)
+        self.val_func(self.filepath, self.pw.text(), self.checked)
+
+    def checked(self, valid, error=None):
+        self.ok_button.setEnabled(True)
+        if error is not None:
+            self.reject()
+        elif not valid:
             self.txt.setText("Incorrect Password")
             self.pw.setFocus()
         else:
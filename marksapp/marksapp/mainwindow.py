@@ -1,41 +1,61 @@
 import os
 import gc
 
-from PyQt5.QtCore import Qt, QItemSelectionModel
+from PyQt5.QtCore import Qt, QEvent, QItemSelectionModel
+from PyQt5.QtGui import QKeySequence
 from PyQt5.QtWidgets import (
     QMainWindow,
     QGridLayout,
     QWidget,
     QFileDialog,
+    QProgressDialog,
+    QShortcut,
 )
 
-from classmarks import Subject
+from classmarks import History, Subject, instrument
 from .resources import Resources
 from .models import StudentModel, TestModel, MarksModel, Sorter
 from .menuframe import MenuFrame
 from .views import StudentListView, TestListView, MarksTableView
 from .dialogs import CatDialog, CheckPasswordDialog, SetPasswordDialog
-from .encrypt import Encryptor, PasswordError
 from .validators import Validator
+from .startup import StartupProfile
+from .workers import SaveWorker, OpenWorker, AutoSaver
+
+EDIT_OPS = {"edit_mark", "edit_marks", "edit_student", "edit_ass", "edit_subject"}
 
 
 class MainWindow(QMainWindow):
-    def __init__(self, app, app_path, filepath=None):
+    def __init__(self, app, app_path, filepath=None, cache_dir=None, profile=None):
         super().__init__()
         self.app = app
         self.app_path = app_path
-        self.resources = Resources(app_path)
-        self.reset()
-        self.set_window()
-        self.create_layout()
-        self.create_models()
-        self.create_widgets()
-        self.connect_methods()
-        if self.filepath:
+        if profile is None:
+            profile = StartupProfile()
+        with profile.phase("resources"):
+            self.resources = Resources(app_path, cache_dir)
+        with profile.phase("subject"):
+            self.reset()
+        with profile.phase("window"):
+            self.set_window()
+            self.create_layout()
+        with profile.phase("models"):
+            self.create_models()
+            self.saver = SaveWorker(self)
+            self.opener = OpenWorker(self)
+            self.autosaver = AutoSaver(parent=self)
+            self.password_callback = None
+            self.progress = None
+            self.loading = False
+        with profile.phase("widgets"):
+            self.create_widgets()
+            self.connect_methods()
+        if filepath:
             self.load_subject(filepath)
 
     def reset(self):
         self.subject = Subject()
+        self.history = History(self.subject)
         self.last_dir = self.app_path
         self.encryptor = None
         self.dirty_project = False
@@ -50,34 +70,96 @@ class MainWindow(QMainWindow):
         self.studentmodel.refresh(self.subject)
         self.testmodel.refresh(self.subject)
         self.marksmodel.refresh(self.subject)
-        self.menu.labels["subject"].setText(self.subject.subject_name)
-        self.menu.labels["class"].setText(self.subject.grade)
+        self.set_labels()
         self.students.clearSelection()
 
+    def set_labels(self):
+        for name, text in (
+            ("subject", self.subject.subject_name),
+            ("class", self.subject.grade),
+        ):
+            label = self.menu.labels[name]
+            label.blockSignals(True)
+            label.setText(text)
+            label.blockSignals(False)
+
     def load_subject(self, filepath):
+        from classmarks.encrypt import get_recovery
+
+        recovery = get_recovery(filepath)
+        if recovery and self.recovery_dialog() == 0:
+            filepath = recovery
         dialog = CheckPasswordDialog(self.resources, self.validate_password, filepath)
         if dialog.exec():
             del dialog
             gc.collect()
-            self.last_dir, file = os.path.split(filepath)
-            self.dirty_project = False
-            self.filepath = filepath
-            self.set_title()
-            self.refresh()
-            self.marksmodel.refresh_size()
+            if self.loading:
+                self.progress = QProgressDialog(
+                    "Opening {}".format(filepath), "Cancel", 0, 0, self
+                )
+                self.progress.setWindowTitle("Class Marks")
+                self.progress.setWindowModality(Qt.WindowModal)
+                self.progress.canceled.connect(self.cancel_loading)
+                self.progress.show()
+        else:
+            self.cancel_loading()
 
-    def validate_password(self, path, pw):
-        encryptor = Encryptor()
-        subject = None
-        try:
-            subject = encryptor.read(path, pw)
-            self.subject = subject
-            self.encryptor = encryptor
-            del pw
-            gc.collect()
-        except PasswordError:
-            pass
-        return subject
+    def validate_password(self, path, pw, callback):
+        from classmarks.encrypt import Encryptor
+
+        self.password_callback = callback
+        self.opener.open(Encryptor(), path, pw)
+        del pw
+        gc.collect()
+
+    def password_checked(self, valid, error=None):
+        self.loading = valid
+        callback, self.password_callback = self.password_callback, None
+        if callback:
+            callback(valid, error)
+
+    def cancel_loading(self):
+        self.opener.cancel()
+        self.loading = False
+        self.password_callback = None
+        self.close_progress()
+
+    def close_progress(self):
+        if self.progress:
+            self.progress.close()
+            self.progress = None
+
+    def subject_loaded(self, encryptor, subject):
+        from classmarks.encrypt import RECOVERY_SUFFIX
+
+        self.loading = False
+        self.close_progress()
+        self.autosaver.cancel()
+        recovered = encryptor.path.endswith(RECOVERY_SUFFIX)
+        if recovered:
+            encryptor.restore(encryptor.path[: -len(RECOVERY_SUFFIX)])
+        self.subject = subject
+        self.history = History(subject)
+        self.encryptor = encryptor
+        self.last_dir, file = os.path.split(encryptor.path)
+        self.dirty_project = recovered or encryptor.replay_error is not None
+        self.filepath = encryptor.path
+        self.set_title()
+        self.refresh()
+        self.marksmodel.refresh_size()
+        if encryptor.replay_error:
+            msg = "Warning: Some recent changes could not be restored.\n{}"
+            msg = msg.format(encryptor.replay_error)
+            dia = CatDialog(msg, self.resources, cat_name="cat_tied")
+            dia.exec()
+
+    def open_failed(self, msg):
+        self.password_checked(False, msg)
+        self.loading = False
+        self.close_progress()
+        msg = "Warning: The file could not be opened.\n{}".format(msg)
+        dia = CatDialog(msg, self.resources, cat_name="cat_tied")
+        dia.exec()
 
     def set_window(self):
         self.setStyleSheet(self.resources.css)
@@ -129,12 +211,68 @@ class MainWindow(QMainWindow):
 
     def set_dirty(self):
         self.dirty_project = True
+        self.autosaver.schedule()
+
+    def autosave(self):
+        if self.dirty_project and self.encryptor and self.encryptor.session:
+            self.saver.autosave(self.encryptor, self.subject)
+
+    def discard_changes(self):
+        self.autosaver.cancel()
+        if self.encryptor and self.encryptor.path:
+            self.saver.discard(self.encryptor)
+
+    def undo(self):
+        records = self.history.undo()
+        if records:
+            self.reset_models(records)
+
+    def redo(self):
+        records = self.history.redo()
+        if records:
+            self.reset_models(records)
+
+    def reset_models(self, records):
+        ops = {record[0] for record in records}
+        if not ops <= EDIT_OPS:
+            self.subject.calc_scores()
+            self.sorter.apply(self.sorter.state)
+            self.marksmodel.reset_display()
+            for model in (self.studentmodel, self.testmodel, self.marksmodel):
+                model.beginResetModel()
+                model.refresh(self.subject)
+                model.endResetModel()
+        else:
+            names = []
+            weights = False
+            for op, *args in records:
+                if op == "edit_mark":
+                    names.append(args[0])
+                elif op == "edit_marks":
+                    names.extend(args[0])
+                elif op == "edit_ass":
+                    weights = weights or "weight" in args[1]
+            if names:
+                self.marksmodel.refresh_students(names)
+            if "edit_student" in ops:
+                self.sorter.apply(self.sorter.state)
+                self.studentmodel.refresh(self.subject)
+                self.marksmodel.refresh(self.subject)
+            if "edit_ass" in ops:
+                self.testmodel.refresh(self.subject)
+                if weights:
+                    self.marksmodel.reset_display()
+                    self.marksmodel.refresh(self.subject)
+        self.set_labels()
+        self.set_dirty()
 
     def open_project(self):
         if self.dirty_project:
             save_it = self.dirty_dialog()
             if save_it != 1:
                 self.save_project()
+            else:
+                self.discard_changes()
         file, type = QFileDialog.getOpenFileName(
             caption="Open Marks File",
             directory=self.last_dir,
@@ -145,8 +283,9 @@ class MainWindow(QMainWindow):
 
     def save_project(self):
         warning_showed = False
+        self.autosaver.cancel()
         if self.encryptor:
-            self.encryptor.resave(self.subject)
+            self.saver.save(self.encryptor, self.subject)
             self.dirty_project = False
             if not self.subject.check_weights():
                 warning_showed = True
@@ -154,7 +293,8 @@ class MainWindow(QMainWindow):
                 dia = CatDialog(msg, self.resources, cat_name="cat_tied")
                 dia.exec()
         else:
-            self.encryptor = Encryptor()
+            from classmarks.encrypt import Encryptor
+
             file, type = QFileDialog.getSaveFileName(
                 caption="Save File as",
                 directory=self.last_dir,
@@ -165,30 +305,56 @@ class MainWindow(QMainWindow):
                     file += ".meow"
                 dialog = SetPasswordDialog(self.resources)
                 if dialog.exec():
-                    self.encryptor.save(self.subject, dialog.pw, file)
+                    self.encryptor = Encryptor()
+                    self.saver.save(self.encryptor, self.subject, dialog.pw, file)
                     self.dirty_project = False
-                    self.filepath = file
-                    self.last_dir, temp = os.path.split(file)
-                    self.set_title()
                     del dialog
                     gc.collect()
         return warning_showed
 
+    def project_saved(self, file):
+        if file != self.filepath:
+            self.filepath = file
+            self.last_dir, temp = os.path.split(file)
+            self.set_title()
+
+    def save_failed(self, msg):
+        self.dirty_project = True
+        msg = "Warning: The file could not be saved.\n{}".format(msg)
+        dia = CatDialog(msg, self.resources, cat_name="cat_tied")
+        dia.exec()
+
     def export_project(self):
         if self.subject:
+            filters = {
+                "csv file (*.csv)": ".csv",
+                "Excel workbook (*.xlsx)": ".xlsx",
+                "Parquet file (*.parquet)": ".parquet",
+                "Arrow IPC file (*.arrow)": ".arrow",
+            }
             file, type = QFileDialog.getSaveFileName(
-                caption="Export Data as .csv",
+                caption="Export Data",
                 directory=self.last_dir,
-                filter="csv file (*.csv)",
+                filter=";;".join(filters),
             )
             if file:
-                self.subject.export(file)
+                if not os.path.splitext(file)[1]:
+                    file += filters.get(type, ".csv")
+                try:
+                    self.subject.export(file)
+                except (ImportError, OSError, ValueError) as error:
+                    msg = "Warning: The file could not be exported.\n{}".format(error)
+                    dia = CatDialog(msg, self.resources, cat_name="cat_tied")
+                    dia.exec()
 
     def new_project(self):
         if self.dirty_project:
             save_it = self.dirty_dialog()
             if save_it != 1:
                 self.save_project()
+            else:
+                self.discard_changes()
+        self.autosaver.cancel()
         self.reset()
         self.refresh()
 
@@ -212,10 +378,10 @@ class MainWindow(QMainWindow):
         self.marksmodel.refresh(self.subject)
 
     def set_subject_name(self):
-        self.subject.subject_name = self.menu.labels["subject"].text()
+        self.subject.edit_subject(subject_name=self.menu.labels["subject"].text())
 
     def set_subject_class(self):
-        self.subject.grade = self.menu.labels["class"].text()
+        self.subject.edit_subject(grade=self.menu.labels["class"].text())
 
     def connect_methods(self):
         self.menu.labels["subject"].textChanged.connect(self.set_subject_name)
@@ -230,6 +396,28 @@ class MainWindow(QMainWindow):
         self.menu.student_buttons["mark"].clicked.connect(self.sort_by_mark)
         self.vs.valueChanged.connect(self.scroll_v)
         self.hs.valueChanged.connect(self.scroll_h)
+        self.saver.saved.connect(self.project_saved)
+        self.saver.failed.connect(self.save_failed)
+        self.autosaver.timeout.connect(self.autosave)
+        self.opener.unlocked.connect(self.password_checked)
+        self.opener.loaded.connect(self.subject_loaded)
+        self.opener.failed.connect(self.open_failed)
+        self.undo_shortcut = QShortcut(QKeySequence.Undo, self)
+        self.undo_shortcut.activated.connect(self.undo)
+        self.redo_shortcut = QShortcut(QKeySequence.Redo, self)
+        self.redo_shortcut.activated.connect(self.redo)
+        if instrument.enabled:
+            self.profile_shortcut = QShortcut(QKeySequence("Ctrl+Shift+P"), self)
+            self.profile_shortcut.activated.connect(self.dump_profile)
+
+    def dump_profile(self):
+        try:
+            path = instrument.recorder.dump()
+            msg = "Profile written to\n{}".format(os.path.abspath(path))
+        except OSError as error:
+            msg = "Warning: The profile could not be written.\n{}".format(error)
+        dia = CatDialog(msg, self.resources, title="Profile", cat_name="cat_tied")
+        dia.exec()
 
     def scroll_h(self, x):
         self.tests.horizontalScrollBar().setValue(x)
@@ -244,21 +432,29 @@ class MainWindow(QMainWindow):
         dia = CatDialog(msg, self.resources, buttons=btns, cat_name="cat_tied")
         return dia.exec()
 
+    def recovery_dialog(self):
+        msg = "Unsaved changes to this file were recovered. Would you like to use them?"
+        btns = ["Recover", "Open Saved"]
+        dia = CatDialog(msg, self.resources, buttons=btns, cat_name="cat_tied")
+        return dia.exec()
+
     def selected_row(self, row=None, refresh_students=False, new_index=None, clear=None):
         if clear is not None:
             self.row = None
             self.students.clearSelection()
             self.marksmodel.refresh(self.subject)
         if row is not None:
-            self.row = row
-            self.marksmodel.refresh(self.subject)
+            old_row, self.row = self.row, row
+            self.marksmodel.refresh_row(old_row)
+            self.marksmodel.refresh_row(row)
             index = self.studentmodel.index(row, 0)
         if refresh_students:
             self.students.clearSelection()
             self.students.selectionModel().select(
                 index, QItemSelectionModel.SelectCurrent
             )
-            self.studentmodel.refresh(self.subject)
+            self.studentmodel.refresh_row(old_row)
+            self.studentmodel.refresh_row(row)
         if new_index is not None:
             self.marks.setCurrentIndex(new_index)
             self.marks.edit(new_index)
@@ -271,3 +467,8 @@ class MainWindow(QMainWindow):
                 warning = self.save_project()
                 if warning:
                     event.ignore()
+            else:
+                self.discard_changes()
+        if event.isAccepted() and self.saver.wait():
+            event.ignore()
+            self.app.sendPostedEvents(None, QEvent.MetaCall)
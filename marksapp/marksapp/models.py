@@ -1,5 +1,4 @@
 from collections import namedtuple
-from operator import attrgetter
 from PyQt5.QtCore import (
     Qt,
     QAbstractListModel,
@@ -10,6 +9,8 @@ from PyQt5.QtCore import (
 
 import numpy as np
 
+from classmarks.instrument import timed
+
 
 class Sorter:
     def __init__(self, subject):
@@ -22,94 +23,73 @@ class Sorter:
         return self.map[index]
 
     def reset(self):
-        self.state = "original"
-        self.map = [x for x in range(len(self))]
+        self.apply("original")
 
     def refresh(self, subject):
         self.subject = subject
+        self.perms = {}
+        self.version = None
         self.reset()
 
     def add(self):
         self.map.append(len(self) - 1)
 
     def remove(self):
-        if self.state == "original":
-            self.reset()
-        elif self.state == "gender_boy":
-            self.state = "gender_girl"
-            self.sort_by_gender()
-        elif self.state == "gender_girl":
-            self.state = "original"
-            self.sort_by_gender()
-        elif self.state == "surname_a":
-            self.state == "original"
-            self.sort_by_surname()
-        elif self.state == "surname_z":
-            self.state == "surname_a"
-            self.sort_by_surname()
-        elif self.state == "mark_1":
-            self.state == "original"
-            self.sort_by_mark()
-        elif self.state == "mark_6":
-            self.state == "mark_1"
-            self.sort_by_mark()
+        self.apply(self.state)
 
-    def sort_by_gender(self):
-        if self.state == "gender_boy":
-            self.reset()
+    def apply(self, state):
+        self.state = state
+        if state == "original":
+            self.map = list(range(len(self)))
         else:
-            sorted_students = sorted(
-                self.subject.students,
-                key=attrgetter("gender", "last_name", "first_name"),
-            )
-            indexes = [
-                self.subject.students.index(student) for student in sorted_students
-            ]
-            if self.state == "gender_girl":
-                for i, index in enumerate(indexes):
-                    if self.subject.students[index].gender == "male":
-                        break
-                else:
-                    i = 0
-                indexes = indexes[i:] + indexes[:i]
-                self.state = "gender_boy"
+            self.map = list(self.get_perm(state))
+
+    def get_perm(self, state):
+        if self.version != self.subject.version:
+            self.perms = {}
+            self.version = self.subject.version
+        if state not in self.perms:
+            if state == "gender_boy":
+                perm = self.get_perm("gender_girl")
+                genders = [self.subject.students[index].gender for index in perm]
+                i = genders.index("male") if "male" in genders else 0
+                perm = perm[i:] + perm[:i]
+            elif state == "surname_z":
+                perm = self.get_perm("surname_a")[::-1]
+            elif state == "mark_6":
+                perm = self.get_perm("mark_1")[::-1]
             else:
-                self.state = "gender_girl"
-            self.map = indexes
+                perm = self.build_perm(state)
+            self.perms[state] = perm
+        return self.perms[state]
+
+    def build_perm(self, state):
+        students = self.subject.students
+        if state == "mark_1":
+            self.subject.calc_scores()
+            marks = self.subject.get_marks(self.subject.tests[0])
+            return [int(index) for index in np.argsort(marks, kind="stable")]
+        if state == "gender_girl":
+            keys = [(student.gender, *self.name_key(student)) for student in students]
+        else:
+            keys = [self.name_key(student) for student in students]
+        return sorted(range(len(keys)), key=keys.__getitem__)
+
+    def name_key(self, student):
+        names = student.fullname.split()
+        return (names[-1:], names[:-1])
+
+    def sort_by_gender(self):
+        states = {"gender_girl": "gender_boy", "gender_boy": "original"}
+        self.apply(states.get(self.state, "gender_girl"))
 
     def sort_by_surname(self):
-        if self.state == "surname_z":
-            self.reset()
-        else:
-            sorted_students = sorted(
-                self.subject.students, key=attrgetter("last_name", "first_name")
-            )
-            indexes = [
-                self.subject.students.index(student) for student in sorted_students
-            ]
-            if self.state == "surname_a":
-                indexes.reverse()
-                self.state = "surname_z"
-            else:
-                self.state = "surname_a"
-            self.map = indexes
+        states = {"surname_a": "surname_z", "surname_z": "original"}
+        self.apply(states.get(self.state, "surname_a"))
 
     def sort_by_mark(self):
-        if self.state == "mark_6":
-            self.reset()
-        else:
-            root = self.subject.tests[0]
-            marks = [
-                self.subject.get_mark(student, root)
-                for student in self.subject.students
-            ]
-            indexes = list(np.argsort(marks))
-            if self.state == "mark_1":
-                indexes.reverse()
-                self.state = "mark_6"
-            else:
-                self.state = "mark_1"
-            self.map = indexes
+        states = {"mark_1": "mark_6", "mark_6": "original"}
+        self.apply(states.get(self.state, "mark_1"))
 
 
 Student = namedtuple("Student", ["fullname", "gender"])
@@ -129,9 +109,15 @@ class StudentModel(QAbstractListModel):
         end = self.createIndex(self.rowCount(), 0)
         self.dataChanged.emit(start, end)
 
+    def refresh_row(self, row):
+        if row is not None and 0 <= row < self.rowCount():
+            index = self.createIndex(row, 0)
+            self.dataChanged.emit(index, index)
+
     def rowCount(self, index=QModelIndex()):
         return self.subject.n_students
 
+    @timed
     def data(self, index, role=Qt.DisplayRole):
         info = QVariant()
         if index.isValid() and role == Qt.DisplayRole:
@@ -201,6 +187,7 @@ class TestModel(QAbstractListModel):
     def rowCount(self, index=QModelIndex()):
         return self.subject.n_tests
 
+    @timed
     def data(self, index, role=Qt.DisplayRole):
         info = QVariant()
         if index.isValid() and role == Qt.DisplayRole:
@@ -222,6 +209,9 @@ class TestModel(QAbstractListModel):
             test = self.subject.tests[index.row()]
             self.subject.edit_ass(test, **value)
             self.dataChanged.emit(index, index)
+            if "weight" in value.keys():
+                self.marksmodel.reset_display()
+                self.marksmodel.refresh(self.subject)
             self.set_dirty()
             return True
         return False
@@ -258,14 +248,19 @@ class TestModel(QAbstractListModel):
 
 
 class MarksModel(QAbstractTableModel):
+    decimal_point = ","
+
     def __init__(self, subject, map, dirty_func, parent=None):
         super().__init__(parent)
         self.map = map
         self.set_dirty = dirty_func
+        self.subject = None
         self.refresh(subject)
 
     def refresh(self, subject):
-        self.subject = subject
+        if subject is not self.subject:
+            self.subject = subject
+            self.reset_display()
         start = self.createIndex(0, 0)
         end = self.createIndex(self.rowCount(), self.columnCount())
         self.dataChanged.emit(start, end)
@@ -279,28 +274,50 @@ class MarksModel(QAbstractTableModel):
     def reset_data(self, subject):
         self.subject = subject
 
+    def reset_display(self):
+        self.display = None
+
+    def refresh_students(self, names):
+        if self.display is not None:
+            for name in set(names):
+                self.display[self.subject.marks.row(name)] = None
+        self.refresh(self.subject)
+
+    def get_display(self, row, col):
+        shape = (self.rowCount(), self.columnCount())
+        if self.display is None or self.display.shape != shape:
+            self.display = np.full(shape, None, dtype=object)
+        text = self.display[row, col]
+        if text is None:
+            student = self.subject.students[row]
+            test = self.subject.tests[col]
+            text = self.conv_num(self.subject.get_mark(student, test))
+            self.display[row, col] = text
+        return text
+
     def conv_num(self, num):
-        text = str(float(num))
-        return text.replace(".", ",")
+        num = float(num)
+        if np.isnan(num):
+            num = 0.0
+        text = str(round(num, 2))
+        return text.replace(".", self.decimal_point)
 
     def conv_str(self, text):
-        text = text.replace(",", ".")
+        text = text.replace(self.decimal_point, ".")
         return float(text)
 
-    def refresh_row(self, index):
-        row = index.row()
-        start = self.createIndex(row, 0)
-        end = self.createIndex(row, self.columnCount() - 1)
-        self.dataChanged.emit(start, end)
+    def refresh_row(self, row):
+        if row is not None and 0 <= row < self.rowCount():
+            start = self.createIndex(row, 0)
+            end = self.createIndex(row, self.columnCount() - 1)
+            self.dataChanged.emit(start, end)
 
+    @timed
     def data(self, index, role=Qt.DisplayRole):
         info = QVariant()
         if index.isValid() and role == Qt.DisplayRole:
             mindex = self.map[index.row()]
-            student = self.subject.students[mindex]
-            test = self.subject.tests[index.column()]
-            mark = self.conv_num(self.subject.get_mark(student, test))
-            info = QVariant(mark)
+            info = QVariant(self.get_display(mindex, index.column()))
         return info
 
     def rowCount(self, index=QModelIndex()):
@@ -315,34 +332,43 @@ class MarksModel(QAbstractTableModel):
             flag = Qt.ItemIsEnabled | Qt.ItemIsEditable
         return flag
 
+    @timed
     def setData(self, index, value, role=Qt.EditRole):
         if index.isValid():
             value = self.conv_str(value)
             mindex = self.map[index.row()]
             student = self.subject.students[mindex]
             test = self.subject.tests[index.column()]
-            self.subject.edit_mark(student, test, value)
-            self.dataChanged.emit(index, index)
+            changed = self.subject.edit_mark(student, test, value)
+            if self.display is not None:
+                self.display[mindex, changed] = None
+            start = self.createIndex(index.row(), min(changed))
+            end = self.createIndex(index.row(), max(changed))
+            self.dataChanged.emit(start, end)
             self.set_dirty()
             return True
         return False
 
     def insertRows(self, position, rows=1, index=QModelIndex()):
         self.beginInsertRows(QModelIndex(), 0, 0)
+        self.reset_display()
         self.endInsertRows()
         return True
 
     def removeRows(self, position, rows=1, index=QModelIndex()):
         self.beginRemoveRows(QModelIndex(), 0, 0)
+        self.reset_display()
         self.endRemoveRows()
         return True
 
     def insertColumns(self, position, columns=1, index=QModelIndex()):
         self.beginInsertColumns(QModelIndex(), 0, 0)
+        self.reset_display()
         self.endInsertColumns()
         return True
 
     def removeColumns(self, position, columns=1, index=QModelIndex()):
         self.beginRemoveColumns(QModelIndex(), 0, 0)
+        self.reset_display()
         self.endRemoveColumns()
         return True
@@ -3,19 +3,59 @@ import json
 from PyQt5.QtGui import QColor, QIcon, QPixmap, QCursor
 
 
+class LazyDict:
+    def __init__(self, loader):
+        self.loader = loader
+        self.items = {}
+
+    def __getitem__(self, name):
+        item = self.items.get(name)
+        if item is None:
+            item = self.loader(name)
+            self.items[name] = item
+        return item
+
+    def __contains__(self, name):
+        return name in self.items
+
+
 class Resources:
-    def __init__(self, app_path):
+    def __init__(self, app_path, cache_dir=None):
         self.folder = os.path.join(app_path, "resources")
+        self.cache_dir = cache_dir
+        self.loaded = {}
+        self.menu_icons = LazyDict(self.get_menu_icon)
+        self.cats = LazyDict(self.get_cat)
+        self.pix = LazyDict(self.get_pix)
+
+    def get(self, name, loader):
+        if name not in self.loaded:
+            self.loaded[name] = loader()
+        return self.loaded[name]
+
+    @property
+    def colors(self):
+        return self.get("colors", self.get_colors)
+
+    @property
+    def qcolors(self):
+        return self.get("qcolors", self.get_qcolors)
+
+    @property
+    def css(self):
+        return self.get("css", self.get_css)
+
+    @property
+    def icon(self):
+        return self.get("icon", self.get_icon)
+
+    @property
+    def cursor(self):
+        return self.get("cursor", self.get_cursor)
+
+    def get_colors(self):
         with open(os.path.join(self.folder, "colors.json")) as colors:
-            self.colors = json.load(colors)
-        self.qcolors = self.get_qcolors()
-        with open(os.path.join(self.folder, "styles.css")) as css:
-            self.css = css.read()
-        self.icon = QIcon(os.path.join(self.folder, "icon.ico"))
-        self.menu_icons = self.get_menu_icons()
-        self.cats = self.get_cats()
-        self.pix = self.get_pix()
-        self.cursor = self.get_cursor()
+            return json.load(colors)
 
     def get_qcolors(self):
         qcolors = dict()
@@ -23,42 +63,45 @@ class Resources:
             qcolors[name] = QColor(color)
         return qcolors
 
-    def get_menu_icons(self):
-        menu_icons = {}
-        names = ["new", "open", "save", "export", "add", "gender", "name", "mark"]
-        for name in names:
-            file = name + ".png"
-            menu_icons[name] = QIcon(os.path.join(self.folder, file))
-        return menu_icons
-
-    def get_cats(self):
-        cats = {}
-        names = [
-            "cat_clean",
-            "cat_hungry",
-            "cat_box",
-            "cat_walk",
-            "cat_poo",
-            "cat_tied",
-            "cat_eyes",
-            "cat_sleep",
-            "cat_ghost",
-        ]
-        for name in names:
-            file = name + ".png"
-            cat = QPixmap(os.path.join(self.folder, file))
-            cats[name] = cat.scaled(64, 64)
-        return cats
-
-    def get_pix(self):
-        pix = {}
-        names = ["male", "female", "paws", "close"]
-        for name in names:
-            file = name + ".png"
-            img = QPixmap(os.path.join(self.folder, file))
-            pix[name] = img.scaled(24, 24)
+    def get_css(self):
+        with open(os.path.join(self.folder, "styles.css")) as css:
+            return css.read()
+
+    def get_icon(self):
+        return QIcon(os.path.join(self.folder, "icon.ico"))
+
+    def get_menu_icon(self, name):
+        return QIcon(os.path.join(self.folder, name + ".png"))
+
+    def get_cat(self, name):
+        return self.get_scaled(name, 64)
+
+    def get_pix(self, name):
+        return self.get_scaled(name, 24)
+
+    def get_scaled(self, name, size):
+        file = os.path.join(self.folder, name + ".png")
+        cached = self.get_cached_path(name, size)
+        if cached and os.path.exists(cached) and os.path.exists(file):
+            if os.path.getmtime(cached) >= os.path.getmtime(file):
+                pix = QPixmap(cached)
+                if not pix.isNull():
+                    return pix
+        pix = QPixmap(file).scaled(size, size)
+        if cached and not pix.isNull():
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                pix.save(cached, "PNG")
+            except OSError:
+                pass
         return pix
 
+    def get_cached_path(self, name, size):
+        path = None
+        if self.cache_dir:
+            path = os.path.join(self.cache_dir, "{}_{}.png".format(name, size))
+        return path
+
     def get_cursor(self):
         cursor = QPixmap(os.path.join(self.folder, "cursor.png"))
         return QCursor(cursor)
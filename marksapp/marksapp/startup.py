@@ -0,0 +1,30 @@
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupProfile:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.start = time.perf_counter()
+        self.phases = []
+
+    def __repr__(self):
+        return "StartupProfile(enabled={}, phases={})".format(
+            self.enabled, len(self.phases)
+        )
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def report(self, file=sys.stdout):
+        width = max([len(name) for name, duration in self.phases] + [5])
+        for name, duration in self.phases:
+            print("{:<{}}  {:8.1f} ms".format(name, width, duration * 1000), file=file)
+        total = time.perf_counter() - self.start
+        print("{:<{}}  {:8.1f} ms".format("total", width, total * 1000), file=file)
@@ -0,0 +1,145 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from classmarks.storage import pack
+
+
+class SaveWorker(QObject):
+    saved = pyqtSignal(str)
+    failed = pyqtSignal(str)
+    recovery_failed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.futures = []
+
+    def save(self, encryptor, subject, pw=None, path=None):
+        records = subject.take_journal()
+        self.futures = [future for future in self.futures if not future.done()]
+        if pw is None and not encryptor.needs_compaction():
+            future = self.executor.submit(self.run, encryptor, records, pw, path)
+        else:
+            snapshot = subject.copy()
+            future = self.executor.submit(self.run, encryptor, snapshot, pw, path)
+        self.futures.append(future)
+        return future
+
+    def run(self, encryptor, data, pw, path):
+        try:
+            if isinstance(data, list):
+                encryptor.append(data)
+            elif pw is None:
+                encryptor.resave(data)
+            else:
+                encryptor.save(data, pw, path)
+        except Exception as error:
+            self.failed.emit(str(error))
+            return str(error)
+        self.discard_recovery(encryptor)
+        self.saved.emit(encryptor.path)
+        return None
+
+    def autosave(self, encryptor, subject):
+        data = pack(subject)
+        self.futures = [future for future in self.futures if not future.done()]
+        future = self.executor.submit(self.run_recovery, encryptor, data)
+        self.futures.append(future)
+        return future
+
+    def run_recovery(self, encryptor, data):
+        try:
+            encryptor.save_recovery(data)
+        except Exception as error:
+            self.recovery_failed.emit(str(error))
+
+    def discard(self, encryptor):
+        future = self.executor.submit(self.discard_recovery, encryptor)
+        self.futures.append(future)
+        return future
+
+    def discard_recovery(self, encryptor):
+        try:
+            encryptor.discard_recovery()
+        except OSError:
+            pass
+
+    def is_busy(self):
+        return any(not future.done() for future in self.futures)
+
+    def wait(self):
+        errors = [future.result() for future in self.futures]
+        self.futures = []
+        return [error for error in errors if error]
+
+
+class OpenWorker(QObject):
+    unlocked = pyqtSignal(bool)
+    loaded = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.job = 0
+
+    def open(self, encryptor, path, pw):
+        self.job += 1
+        return self.executor.submit(self.run, self.job, encryptor, path, pw)
+
+    def cancel(self):
+        self.job += 1
+
+    def run(self, job, encryptor, path, pw):
+        from classmarks.encrypt import PasswordError
+
+        try:
+            data = encryptor.unlock(path, pw)
+        except PasswordError:
+            self.send(job, self.unlocked, False)
+            return
+        except Exception as error:
+            self.send(job, self.failed, str(error))
+            return
+        self.send(job, self.unlocked, True)
+        try:
+            subject = encryptor.load(data)
+            subject.calc_scores()
+        except Exception as error:
+            self.send(job, self.failed, str(error))
+        else:
+            self.send(job, self.loaded, encryptor, subject)
+
+    def send(self, job, signal, *args):
+        if job == self.job:
+            signal.emit(*args)
+
+
+class AutoSaver(QObject):
+    timeout = pyqtSignal()
+
+    def __init__(self, delay=3000, max_wait=30000, parent=None):
+        super().__init__(parent)
+        self.delay = delay
+        self.max_wait = max_wait
+        self.first = None
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.fire)
+
+    def schedule(self):
+        now = time.monotonic()
+        if self.first is None:
+            self.first = now
+        if (now - self.first) * 1000 < self.max_wait or not self.timer.isActive():
+            self.timer.start(self.delay)
+
+    def cancel(self):
+        self.timer.stop()
+        self.first = None
+
+    def fire(self):
+        self.first = None
+        self.timeout.emit()
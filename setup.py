@@ -8,6 +8,10 @@ setup(name='classmarks',
       install_requires=[
           'pandas',
           'numpy',
-          'anytree'
+          'anytree',
+          'cryptography',
+          'argon2-cffi',
       ],
+      extras_require={'export': ['pyarrow', 'openpyxl']},
+      entry_points={"console_scripts": ["classmarks = classmarks.__main__:main"]},
       zip_safe=False)
@@ -0,0 +1,28 @@
+import pytest
+
+from classmarks import Subject
+from classmarks.encrypt import Encryptor
+
+
+@pytest.fixture
+def password():
+    return "password"
+
+
+@pytest.fixture
+def subject():
+    subject = Subject("7b", "Maths")
+    subject.add_students(["Ann Lee", "Bo Ray"], ["female", "male"])
+    major = subject.add_ass("Exams")
+    sub = subject.add_ass("Written", major)
+    subject.add_ass("Final", sub)
+    subject.take_journal()
+    return subject
+
+
+@pytest.fixture
+def saved(tmp_path, subject, password):
+    path = str(tmp_path / "marks.meow")
+    encryptor = Encryptor(compact_size=float("inf"))
+    encryptor.save(subject, password, path)
+    return (path, encryptor)
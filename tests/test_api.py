@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from classmarks import Gradebook
+
+TREE = {
+    "Exams": {"weight": 0.6, "children": {"Written": {"children": {"Final": {}}}}},
+    "Homework": {"weight": 0.4, "children": {"Sheets": {"children": {"HW1": {}}}}},
+}
+
+
+@pytest.fixture
+def book():
+    book = Gradebook.new("7b", "Maths")
+    book.add_students(["Ann Lee", "Bo Ray"], ["female", "male"])
+    book.add_assessments(TREE)
+    return book
+
+
+def test_set_marks_and_scores(book):
+    book.set_marks([[5.5, 4.0], [4.5, 6.0]], assessments=["Final", "HW1"])
+    np.testing.assert_allclose(book.scores(), [4.9, 5.1])
+    np.testing.assert_allclose(book.scores("Exams"), [5.5, 4.5])
+    marks = book.marks(["Bo Ray"], ["Final", "HW1"])
+    np.testing.assert_allclose(marks, [[4.5, 6.0]])
+
+
+def test_save_reopen_and_append(book, tmp_path, password):
+    path = str(tmp_path / "maths.meow")
+    book.set_marks([[5.5, 4.0], [4.5, 6.0]], assessments=["Final", "HW1"])
+    book.save(path, password)
+
+    book = Gradebook.open(path, password)
+    np.testing.assert_allclose(book.scores(), [4.9, 5.1])
+    size = book.encryptor.end
+    book.set_marks([6.0], ["Ann Lee"], ["Final"])
+    book.add_students(["Cy Dee"])
+    assert book.save() == path
+    assert book.encryptor.end > size
+    assert book.encryptor.journal_size > 0
+
+    book = Gradebook.open(path, password)
+    assert book.students == ["Ann Lee", "Bo Ray", "Cy Dee"]
+    np.testing.assert_allclose(book.scores()[:2], [5.2, 5.1])
+
+
+def test_add_assessments_is_atomic(book):
+    before = book.assessments
+    steps = len(book.history.undos)
+    journal = list(book.subject.journal)
+    tree = {
+        "Projects": {"children": {"W": {"children": {"Final 2": {}}}}},
+        "Oral": {"children": {"W": {}}},
+    }
+    with pytest.raises(ValueError, match="W appears twice"):
+        book.add_assessments(tree)
+    with pytest.raises(ValueError, match="HW1 already exists"):
+        book.add_assessments({"Projects": {"children": {"HW1": {}}}})
+    with pytest.raises(ValueError, match="three levels"):
+        book.add_assessments({"Quiz": {"children": {"Q1": {}}}}, "Sheets")
+    with pytest.raises(ValueError, match="Cannot add"):
+        book.add_assessments({"Quiz": {}}, "Final")
+    assert book.assessments == before
+    assert len(book.history.undos) == steps
+    assert book.subject.journal == journal
+
+
+def test_unknown_names_raise_key_error(book):
+    with pytest.raises(KeyError):
+        book.set_marks([1.0], ["Nobody"], ["Final"])
+    with pytest.raises(KeyError):
+        book.marks(assessments=["Missing"])
@@ -0,0 +1,31 @@
+import pandas as pd
+
+from classmarks.__main__ import main
+from classmarks.encrypt import Encryptor
+
+
+def test_combines_good_files_and_reports_bad(
+    tmp_path, subject, password, monkeypatch, capsys
+):
+    folder = tmp_path / "marks"
+    folder.mkdir()
+    final = subject.get_ass_by_name("Final")
+    subject.edit_mark(subject.students[0], final, 4.5)
+    Encryptor().save(subject, password, str(folder / "a.meow"))
+    subject.edit_subject(grade="7c")
+    subject.add_ass("class")
+    Encryptor().save(subject, password, str(folder / "b.meow"))
+    (folder / "c.meow").write_bytes(b"not marks")
+    output = tmp_path / "scores.csv"
+    monkeypatch.setenv("MARKS_PW", password)
+
+    status = main([str(folder), "-o", str(output), "--password-env", "MARKS_PW"])
+
+    assert status == 1
+    assert "c.meow" in capsys.readouterr().err
+    df = pd.read_csv(output, sep=";")
+    ids = ["file", "class", "subject", "student", "gender"]
+    assert list(df.columns) == ids + ["Total", "Exams", "major class"]
+    assert list(df["class"]) == ["7b", "7b", "7c", "7c"]
+    assert list(df["student"]) == ["Ann Lee", "Bo Ray"] * 2
+    assert list(df["Exams"].fillna(0)) == [4.5, 0.0, 4.5, 0.0]
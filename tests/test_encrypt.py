@@ -0,0 +1,76 @@
+import pickle
+
+import pytest
+from argon2 import PasswordHasher as Hash
+from cryptography.fernet import Fernet
+
+from classmarks import Subject
+from classmarks.encrypt import MAGIC, Encryptor, PasswordError
+from classmarks.marksheet import MarkSheet
+from classmarks.storage import pack
+
+
+def test_garbage_is_not_a_classmarks_file(tmp_path, password):
+    path = tmp_path / "notes.meow"
+    for data in (b"hello", b"\xff\xfe\x00binary", b""):
+        path.write_bytes(data)
+        with pytest.raises(ValueError, match="not a classmarks file"):
+            Encryptor().read(str(path), password)
+
+
+def test_truncated_snapshot(saved, password):
+    path, encryptor = saved
+    with open(path, "rb") as file:
+        data = file.read()
+    for size in (10, 60, len(data) - 20):
+        with open(path, "wb") as file:
+            file.write(data[:size])
+        with pytest.raises(ValueError, match="truncated"):
+            Encryptor().read(path, password)
+
+
+def test_wrong_password(saved):
+    path, encryptor = saved
+    with pytest.raises(PasswordError):
+        Encryptor().read(path, "wrong")
+
+
+def write_legacy(path, subject, password, monkeypatch):
+    state = {
+        "grade": subject.grade,
+        "subject_name": subject.subject_name,
+        "student_suffix": subject.student_suffix,
+        "cls": subject.cls,
+        "students": subject.students,
+        "marks": subject.marks,
+        "tests": subject.tests,
+    }
+    monkeypatch.setattr(Subject, "__getstate__", lambda self: state)
+    monkeypatch.setattr(MarkSheet, "__getstate__", lambda self: {"df": self.df})
+    data = pickle.dumps(subject)
+    monkeypatch.undo()
+    hash = Hash(hash_len=32, salt_len=32).hash(password)
+    key = Encryptor().format_b64s(hash.split("$")[-1])
+    header = "$".join(hash.split("$")[:-1]) + "$"
+    with open(path, "wb") as file:
+        file.write(bytes(header, "utf-8") + Fernet(key).encrypt(data))
+
+
+def test_legacy_file_opens_and_resaves(tmp_path, subject, password, monkeypatch):
+    final = subject.get_ass_by_name("Final")
+    subject.edit_mark(subject.students[0], final, 7.5)
+    path = str(tmp_path / "old.meow")
+    write_legacy(path, subject, password, monkeypatch)
+
+    encryptor = Encryptor()
+    legacy = encryptor.read(path, password)
+    assert encryptor.legacy
+    assert pack(legacy) == pack(subject)
+    assert legacy.marks.df.equals(subject.marks.df)
+
+    encryptor.resave(legacy)
+    with open(path, "rb") as file:
+        assert file.read().startswith(MAGIC)
+    encryptor = Encryptor()
+    assert pack(encryptor.read(path, password)) == pack(subject)
+    assert not encryptor.legacy
@@ -0,0 +1,113 @@
+import csv
+import math
+
+import pandas as pd
+import pytest
+
+from classmarks import Subject
+from classmarks.export import FIELDS, export
+
+IDS = ["class", "subject", "student", "gender"]
+NAMES = ["Total", "Exams", "Written", "Final", "Homework", "Sheets", "Week 1"]
+
+
+@pytest.fixture
+def subjects(subject):
+    subject.edit_mark(subject.students[0], subject.get_ass_by_name("Final"), 4.5)
+    other = Subject("8a", "Maths")
+    other.add_students(["Di Fox"], ["female"])
+    major = other.add_ass("Homework")
+    sheets = other.add_ass("Sheets", major)
+    other.add_ass("Week 1", sheets)
+    other.edit_ass(major, date="2024-05-01")
+    other.edit_mark(other.students[0], other.get_ass_by_name("Week 1"), 3.0)
+    for each in (subject, other):
+        each.calc_scores()
+    return [subject, other]
+
+
+def get_rows(subjects):
+    rows = []
+    for subject in subjects:
+        names = set(subject.marks.assessments)
+        for student in subject.students:
+            ids = [subject.grade, subject.subject_name]
+            ids += [student.fullname, student.gender]
+            marks = []
+            for name in NAMES:
+                mark = math.nan
+                if name in names:
+                    mark = subject.get_mark(student, subject.get_ass_by_name(name))
+                marks.append(float(mark))
+            rows.append((ids, marks))
+    return rows
+
+
+def test_marksheet_export(tmp_path, subject):
+    path = tmp_path / "marks.csv"
+    subject.marks.export(path)
+    df = pd.read_csv(path, sep=";", index_col="Students")
+    assert list(df.index) == ["Ann Lee", "Bo Ray"]
+    assert list(df.columns) == list(subject.marks.assessments)
+
+
+def test_csv_round_trip(tmp_path, subjects):
+    path = str(tmp_path / "marks.csv")
+    export(subjects, path, chunk_size=1)
+    with open(path, newline="", encoding="utf-8") as file:
+        lines = list(csv.reader(file, delimiter=";"))
+
+    info = {}
+    for line in lines[:8]:
+        field, grade = line[0][1:], line[1]
+        info.setdefault(grade, {})[field] = dict(zip(NAMES, line[len(IDS) :]))
+    assert set(info) == {"7b", "8a"}
+    for subject in subjects:
+        columns = info[subject.grade]
+        for name in NAMES:
+            if name not in subject.marks.columns:
+                assert all(columns[field][name] == "" for field in columns)
+                continue
+            test = subject.get_ass_by_name(name)
+            parent = test.parent.name if test.parent is not None else ""
+            assert columns["group"][name] == test.group
+            assert columns["parent"][name] == parent
+            assert float(columns["weight"][name]) == test.weight
+            assert columns["date"][name] == test.date
+
+    assert lines[8] == IDS + NAMES
+    rows = []
+    for line in lines[9:]:
+        marks = [float(mark) if mark else math.nan for mark in line[len(IDS) :]]
+        rows.append((line[: len(IDS)], marks))
+    assert len(rows) == len(get_rows(subjects))
+    for (ids, marks), (expected_ids, expected) in zip(rows, get_rows(subjects)):
+        assert ids == expected_ids
+        assert marks == pytest.approx(expected, nan_ok=True)
+
+
+def test_arrow_columns(tmp_path, subjects):
+    pa = pytest.importorskip("pyarrow")
+    path = str(tmp_path / "marks.arrow")
+    export(subjects, path)
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    assert table.column_names == IDS + NAMES
+    assert table.schema.field("Final").type == pa.float64()
+    assert table.schema.field("Week 1").metadata[b"parent"] == b"Sheets"
+    assert table.column("student").to_pylist() == ["Ann Lee", "Bo Ray", "Di Fox"]
+    assert table.column("Week 1").to_pylist()[2] == 3.0
+
+
+def test_xlsx_columns(tmp_path, subjects):
+    openpyxl = pytest.importorskip("openpyxl")
+    path = str(tmp_path / "marks.xlsx")
+    export(subjects, path)
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    rows = list(workbook["Marks"].values)
+    assert list(rows[0]) == IDS + NAMES
+    assert [row[2] for row in rows[1:]] == ["Ann Lee", "Bo Ray", "Di Fox"]
+    assert rows[1][len(IDS) + NAMES.index("Final")] == 4.5
+    assessments = list(workbook["Assessments"].values)
+    assert list(assessments[0]) == ["class", "subject", "name"] + FIELDS
+    assert len(assessments) == 1 + len(subjects[0].tests) + len(subjects[1].tests)
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from classmarks import History, Subject
+
+
+@pytest.fixture
+def subject(subject):
+    subject.add_student("Cy Dee", "male")
+    subject.add_ass("Mock", subject.get_ass_by_name("Written"))
+    return subject
+
+
+def get_marks(subject):
+    subject.calc_scores()
+    return np.nan_to_num(subject.marks.values)
+
+
+def snapshot(subject):
+    students = [(student.fullname, student.gender) for student in subject.students]
+    tests = []
+    for test in subject.tests:
+        parent = test.parent.name if test.parent is not None else None
+        tests.append((test.name, test.group, test.weight, test.date, parent))
+    names = (subject.grade, subject.subject_name, subject.marks.students)
+    return (students, tests, names, get_marks(subject).tolist())
+
+
+def test_undo_redo_round_trip(subject):
+    history = History(subject)
+    final = subject.get_ass_by_name("Final")
+    mock = subject.get_ass_by_name("Mock")
+    states = [snapshot(subject)]
+    edits = [
+        lambda: subject.edit_mark(subject.students[0], final, 5.5),
+        lambda: subject.edit_marks([[4.0, 3.0]], subject.students[1:2], [final, mock]),
+        lambda: subject.add_student("Di Fox", "female"),
+        lambda: subject.edit_student(subject.students[1], name="Bo Rae"),
+        lambda: subject.edit_ass(final, name="Finals", weight=0.5),
+        lambda: subject.add_ass(parent=subject.get_ass_by_name("Exams")),
+        lambda: subject.delete_student(subject.students[0]),
+        lambda: subject.delete_ass(subject.get_ass_by_name("Written")),
+        lambda: subject.edit_subject(grade="8b"),
+    ]
+    for edit in edits:
+        edit()
+        states.append(snapshot(subject))
+
+    for state in reversed(states[:-1]):
+        assert history.undo()
+        assert snapshot(subject) == state
+    assert not history.undo()
+    for state in states[1:]:
+        assert history.redo()
+        assert snapshot(subject) == state
+    assert not history.redo()
+
+
+def test_undo_returns_the_applied_records(subject):
+    history = History(subject)
+    final = subject.get_ass_by_name("Final")
+    subject.edit_mark(subject.students[0], final, 5.5)
+    assert history.undo() == [["edit_mark", "Ann Lee", "Final", 0.0]]
+    assert history.redo() == [["edit_mark", "Ann Lee", "Final", 5.5]]
+
+
+def test_delete_keeps_only_the_removed_slice(subject):
+    for index in range(50):
+        subject.add_student("Student {}".format(index))
+    history = History(subject)
+    subject.delete_student(subject.students[0])
+    forward, inverse, size = history.undos[-1]
+    row = inverse[0][4]
+    assert row.shape == (subject.n_tests,)
+
+    subject.delete_ass(subject.get_ass_by_name("Written"))
+    forward, inverse, size = history.undos[-1]
+    values = inverse[0][4]
+    assert values.shape == (subject.n_students, 3)
+
+
+def test_new_edit_clears_redo(subject):
+    history = History(subject)
+    subject.edit_subject(grade="8b")
+    history.undo()
+    assert history.can_redo
+    subject.edit_subject(subject_name="Physics")
+    assert not history.can_redo
+
+
+def test_budget_evicts_oldest_first(subject):
+    history = History(subject, budget=4000)
+    final = subject.get_ass_by_name("Final")
+    for mark in range(1, 101):
+        subject.edit_mark(subject.students[0], final, mark / 20)
+    assert history.size <= history.budget
+    assert 0 < len(history.undos) < 100
+    while history.undo():
+        pass
+    assert subject.get_mark(subject.students[0], final) > 0
+
+
+def test_failed_edit_is_not_remembered(subject):
+    history = History(subject)
+    with pytest.raises(ValueError):
+        subject.add_students(["Ann Lee"])
+    with pytest.raises(KeyError):
+        subject.edit_mark(subject.students[0], Subject().add_ass(), 3.0)
+    assert not history.can_undo
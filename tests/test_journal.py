@@ -0,0 +1,88 @@
+import pytest
+
+from classmarks import Subject
+from classmarks.encrypt import Encryptor, PasswordError
+from classmarks.journal import decode, encode, replay
+from classmarks.storage import pack
+
+def get_test(subject, name="Final"):
+    return subject.get_ass_by_name(name)
+
+
+def test_save_append_reopen(subject, saved, password):
+    path, encryptor = saved
+    subject.edit_mark(subject.students[0], get_test(subject), 5.5)
+    subject.add_student("Cy Dee", "female")
+    subject.edit_ass(get_test(subject), name="Finals")
+    subject.edit_subject(grade="8b")
+    encryptor.append(subject.take_journal())
+    assert encryptor.journal_size > 0
+
+    reopened = Encryptor().read(path, password)
+    assert pack(reopened) == pack(subject)
+    assert reopened.journal == []
+
+
+def test_torn_frame_is_ignored(subject, saved, password):
+    path, encryptor = saved
+    expected = pack(subject)
+    subject.edit_mark(subject.students[0], get_test(subject), 5.5)
+    encryptor.append(subject.take_journal())
+    with open(path, "r+b") as file:
+        file.truncate(encryptor.end - 10)
+
+    reader = Encryptor()
+    assert pack(reader.read(path, password)) == expected
+    assert reader.replay_error is None
+
+
+def test_rekey_then_save_writes_a_snapshot(subject, saved, password):
+    path, encryptor = saved
+    subject.edit_mark(subject.students[0], get_test(subject), 4.0)
+    encryptor.append(subject.take_journal())
+
+    encryptor.rekey("new password")
+    assert encryptor.needs_compaction()
+    subject.edit_mark(subject.students[1], get_test(subject), 3.0)
+    subject.take_journal()
+    encryptor.resave(subject)
+
+    assert pack(Encryptor().read(path, "new password")) == pack(subject)
+    with pytest.raises(PasswordError):
+        Encryptor().read(path, password)
+
+
+def test_failed_mutator_leaves_no_record(subject):
+    foreign = Subject().add_ass("Homework")
+    with pytest.raises(KeyError):
+        subject.edit_mark(subject.students[0], foreign, 3.0)
+    with pytest.raises(ValueError):
+        subject.add_students(["Ann Lee"])
+    with pytest.raises(ValueError):
+        subject.edit_marks([float("nan")], subject.students[:1], [get_test(subject)])
+    assert subject.journal == []
+
+
+def test_bad_record_stops_replay(subject, saved, password):
+    path, encryptor = saved
+    subject.edit_mark(subject.students[0], get_test(subject), 5.0)
+    good = pack(subject)
+    records = subject.take_journal()
+    records.append(["edit_mark", "Ann Lee", "Missing", 3.0])
+    records.append(["edit_mark", "Ann Lee", "Final", 1.0])
+    encryptor.append(records)
+
+    reader = Encryptor()
+    reopened = reader.read(path, password)
+    assert pack(reopened) == good
+    assert "record 2" in reader.replay_error
+    assert reader.needs_compaction()
+
+
+def test_replay_round_trip(subject):
+    copy = subject.copy()
+    asses = subject.add_asses(["Quiz", "Test"], get_test(subject, "Written"))
+    subject.edit_marks([[1.0, 2.0], [3.0, 4.0]], subject.students, asses)
+    subject.delete_student(subject.students[0])
+    replay(copy, decode(encode(subject.take_journal())))
+    assert pack(copy) == pack(subject)
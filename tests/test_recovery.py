@@ -0,0 +1,31 @@
+import os
+
+from classmarks.encrypt import RECOVERY_SUFFIX, Encryptor, get_recovery
+from classmarks.storage import pack
+
+
+def test_recovery_is_offered_and_restored(subject, saved, password):
+    path, encryptor = saved
+    assert get_recovery(path) is None
+    subject.add_student("Cy Dee")
+    encryptor.save_recovery(pack(subject))
+    recovery = path + RECOVERY_SUFFIX
+    os.utime(path, (0, 0))
+    assert get_recovery(path) == recovery
+
+    reader = Encryptor()
+    recovered = reader.read(recovery, password)
+    assert pack(recovered) == pack(subject)
+    reader.restore(path)
+    assert reader.needs_compaction()
+    reader.resave(recovered)
+    reader.discard_recovery()
+    assert get_recovery(path) is None
+    assert pack(Encryptor().read(path, password)) == pack(subject)
+
+
+def test_stale_recovery_is_ignored(subject, saved):
+    path, encryptor = saved
+    encryptor.save_recovery(pack(subject))
+    os.utime(path + RECOVERY_SUFFIX, (0, 0))
+    assert get_recovery(path) is None
@@ -0,0 +1,61 @@
+import random
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def subject(subject):
+    subject.add_students(["Student {}".format(index) for index in range(4)])
+    exams = subject.get_ass_by_name("Exams")
+    subject.edit_ass(exams, weight=0.6)
+    subject.edit_ass(subject.get_ass_by_name("Written"), weight=0.5)
+    (homework,) = subject.add_asses(["Homework"], weights=[0.4])
+    subs = [subject.get_ass_by_name("Written")]
+    subs += subject.add_asses(["Oral"], exams, weights=[0.5])
+    subs += subject.add_asses(["Sheets", "Projects"], homework, weights=[0.5, 0.5])
+    for sub in subs:
+        subject.add_asses([sub.name + " {}".format(index) for index in range(3)], sub)
+    return subject
+
+
+def recompute(subject):
+    subject = subject.copy()
+    subject.calc_scores()
+    return subject.marks.values
+
+
+def get_tests(subject):
+    return [test for test in subject.tests if test.group == "test"]
+
+
+def test_edit_marks_matches_recompute(subject):
+    subject.calc_scores()
+    rng = random.Random(0)
+    tests = get_tests(subject)
+    for step in range(50):
+        students = rng.sample(subject.students, rng.randint(1, 6))
+        asses = rng.sample(tests, rng.randint(1, 4))
+        marks = [[rng.choice([0, 1, 3.5, 6]) for ass in asses] for student in students]
+        subject.edit_marks(marks, students, asses)
+        np.testing.assert_allclose(subject.marks.values, recompute(subject))
+
+
+def test_edit_marks_updates_every_ancestor(subject):
+    subject.calc_scores()
+    student = subject.students[0]
+    tests = get_tests(subject)
+    subject.edit_marks([6.0] * len(tests), [student] * len(tests), tests)
+    total = subject.get_mark(student, subject.tests)
+    assert total == pytest.approx(6.0)
+    for major in subject.tests.children:
+        assert subject.get_mark(student, major) == pytest.approx(6.0)
+
+
+def test_edit_mark_matches_recompute(subject):
+    rng = random.Random(1)
+    tests = get_tests(subject)
+    for step in range(200):
+        student = rng.choice(subject.students)
+        subject.edit_mark(student, rng.choice(tests), rng.choice([0, 2, 4.5, 6]))
+        np.testing.assert_allclose(subject.marks.values, recompute(subject))